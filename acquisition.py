@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# 코어1 센서 수집 (RP2040 듀얼 코어)
+# 코어1 스레드가 LSM6DS3 / BMP280 을 고정 주기로 샘플링하여 링 버퍼에 넣고,
+# 코어0 의 메인 상태 머신은 링 버퍼에서 샘플을 꺼내 처리함.
+# 오디오 재생(I2S)이나 로그 기록으로 코어0 이 블로킹되어도 샘플링 주기가 흔들리지 않음.
+# 호스트(CPython)에서도 _thread 로 동일하게 실행됨.
+import _thread
+import utime
+from array import array
+import config
+import motion_sensor
+import pressure_sensor
+
+class SampleRing:
+    """미리 할당된 단일 생산자/단일 소비자 링 버퍼 (잠금 없음)
+
+    생산자(코어1)는 _head 만, 소비자(코어0)는 _tail 만 갱신함.
+    데이터를 먼저 기록한 뒤 인덱스를 갱신하므로 소비자는 완성된 샘플만 읽음.
+    가득 차면 새 샘플을 버리고 overruns 를 증가시킴.
+    """
+    def __init__(self, capacity, width, typecode):
+        self._size = capacity + 1 # 가득 참/비어 있음 구분용 빈 칸 1개
+        self._width = width
+        self._ticks = array('i', [0] * self._size)
+        self._values = array(typecode, [0] * (self._size * width))
+        self._head = 0
+        self._tail = 0
+        self.overruns = 0
+
+    def push(self, ticks, v0, v1=0, v2=0):
+        """생산자 전용: 샘플 추가 (가득 차면 False)"""
+        head = self._head
+        next_head = head + 1
+        if next_head == self._size: next_head = 0
+        if next_head == self._tail:
+            self.overruns += 1; return False
+        self._ticks[head] = ticks
+        base = head * self._width
+        values = self._values
+        values[base] = v0
+        if self._width > 1: values[base + 1] = v1
+        if self._width > 2: values[base + 2] = v2
+        self._head = next_head
+        return True
+
+    def pop(self, out):
+        """소비자 전용: 가장 오래된 샘플을 out 리스트([ticks, v0, ...])에 채움 (비었으면 False)"""
+        tail = self._tail
+        if tail == self._head: return False
+        out[0] = self._ticks[tail]
+        base = tail * self._width
+        for i in range(self._width): out[i + 1] = self._values[base + i]
+        tail += 1
+        if tail == self._size: tail = 0
+        self._tail = tail
+        return True
+
+    def clear(self):
+        """소비자 전용: 쌓인 샘플 모두 버림"""
+        self._tail = self._head
+
+    def __len__(self):
+        return (self._head - self._tail) % self._size
+
+# 모듈 전역 변수
+_log_func = None
+accel_ring = SampleRing(config.ACQ_ACCEL_RING_SIZE, 3, 'h')
+pressure_ring = SampleRing(config.ACQ_PRESSURE_RING_SIZE, 2, 'f') # (압력 Pa, 변환 오버샘플링 단계)
+_accel_sample = array('i', [0, 0, 0]) # 코어1 전용 읽기 버퍼
+_accel_out = [0, 0, 0, 0]
+_pressure_out = [0, 0.0, 0.0]
+_run_requested = False
+_running = False
+_pressure_active = False # 기압 샘플링 여부 (모니터링 중에만 활성)
+_accel_activity_request = False # 코어0 이 요청한 가속도 ODR 상태 (코어1 에서 적용)
+accel_errors = 0
+pressure_errors = 0
+_last_accel_ticks = 0 # 마지막으로 가속도 샘플을 읽은 시각 (코어1 이 갱신, 코어0 이 상태 확인에 사용)
+late_samples = 0 # 주기를 놓쳐 재동기화한 횟수
+
+def _log(message):
+    if _log_func: _log_func(f"[Acquisition] {message}")
+    else: print(f"[Acquisition] {message}")
+
+def _next_deadline(deadline, period_ms, now):
+    """다음 샘플링 시각 계산 (주기 누적으로 지터 없음, 크게 밀리면 현재 시각 기준으로 재동기화)"""
+    global late_samples
+    deadline = utime.ticks_add(deadline, period_ms)
+    if utime.ticks_diff(now, deadline) >= 0:
+        late_samples += 1; deadline = utime.ticks_add(now, period_ms)
+    return deadline
+
+def _core1_loop():
+    """코어1 수집 루프 - 로그 파일 접근 없이 카운터만 갱신"""
+    global _running, accel_errors, pressure_errors, _last_accel_ticks
+    now = utime.ticks_ms()
+    accel_deadline = now
+    pressure_deadline = now
+    pressure_ready_at = None # 진행 중인 BMP280 변환의 완료 시각
+    pressure_oss = 0 # 진행 중인 BMP280 변환의 오버샘플링 단계
+    accel_activity = None # 코어1 에서 적용한 가속도 ODR 상태
+    try:
+        while _run_requested:
+            if accel_activity != _accel_activity_request:
+                try: motion_sensor.apply_activity(_accel_activity_request); accel_activity = _accel_activity_request
+                except Exception: accel_errors += 1
+            now = utime.ticks_ms()
+            if utime.ticks_diff(now, accel_deadline) >= 0:
+                try:
+                    motion_sensor.read_accel_sample(_accel_sample)
+                    _last_accel_ticks = now
+                    accel_ring.push(now, _accel_sample[0], _accel_sample[1], _accel_sample[2])
+                except Exception: accel_errors += 1
+                accel_deadline = _next_deadline(accel_deadline, config.ACQ_ACCEL_PERIOD_MS, now)
+
+            if pressure_ready_at is not None:
+                # 변환 완료 대기 중 (블로킹하지 않고 가속도 샘플링 계속)
+                if utime.ticks_diff(now, pressure_ready_at) >= 0:
+                    try: pressure_ring.push(now, pressure_sensor.read_measurement(), pressure_oss)
+                    except Exception: pressure_errors += 1
+                    pressure_ready_at = None
+            elif _pressure_active and utime.ticks_diff(now, pressure_deadline) >= 0:
+                try:
+                    pressure_ready_at = utime.ticks_add(now, pressure_sensor.start_measurement())
+                    pressure_oss = pressure_sensor.measurement_oss()
+                except Exception: pressure_errors += 1
+                pressure_deadline = _next_deadline(pressure_deadline, config.ACQ_PRESSURE_PERIOD_MS, now)
+            elif not _pressure_active:
+                pressure_deadline = now
+
+            # 가장 가까운 다음 작업 시각까지 대기
+            wait_ms = utime.ticks_diff(accel_deadline, utime.ticks_ms())
+            if pressure_ready_at is not None: wait_ms = min(wait_ms, utime.ticks_diff(pressure_ready_at, utime.ticks_ms()))
+            elif _pressure_active: wait_ms = min(wait_ms, utime.ticks_diff(pressure_deadline, utime.ticks_ms()))
+            if wait_ms > 0: utime.sleep_ms(wait_ms)
+    finally:
+        _running = False
+
+def start(log_callback=None):
+    """코어1 수집 스레드 시작 (센서 init 이후 호출)"""
+    global _log_func, _run_requested, _running, _last_accel_ticks
+    _log_func = log_callback
+    if _running: return True
+    accel_ring.clear(); pressure_ring.clear()
+    _run_requested = True
+    _running = True # 스레드가 실제로 돌기 전에 상태 확인에서 정지로 오판하지 않도록 미리 설정
+    _last_accel_ticks = utime.ticks_ms()
+    try:
+        _thread.start_new_thread(_core1_loop, ())
+    except Exception as e:
+        _run_requested = False; _running = False
+        _log(f"코어1 스레드 시작 실패: {e}"); return False
+    _log(f"코어1 수집 시작 (가속도 {config.ACQ_ACCEL_PERIOD_MS}ms, 기압 {config.ACQ_PRESSURE_PERIOD_MS}ms 주기)")
+    return True
+
+def stop(timeout_ms=1000):
+    """코어1 수집 중지 요청 후 종료 대기"""
+    global _run_requested
+    _run_requested = False
+    start_ticks = utime.ticks_ms()
+    while _running and utime.ticks_diff(utime.ticks_ms(), start_ticks) < timeout_ms: utime.sleep_ms(5)
+    if _running: _log("코어1 수집 종료 대기 시간 초과")
+    # 정상 종료 통계 - log_analyzer 가 오류로 분류하는 단어('오류', '실패')를 쓰지 않음
+    else: _log(f"코어1 수집 종료 (I2C 읽기 불가 가속도 {accel_errors}/기압 {pressure_errors}, 지연 {late_samples}, "
+               f"버림 {accel_ring.overruns}/{pressure_ring.overruns})")
+
+def is_running():
+    return _running
+
+def health_problem(now_ms):
+    """코어1 수집 상태 확인 (코어0 유휴 구간에서 호출) - 정상이면 None, 이상이면 원인 문자열"""
+    if not _running: return "코어1 스레드 정지"
+    stalled_ms = utime.ticks_diff(now_ms, _last_accel_ticks)
+    if stalled_ms > config.ACQ_STALL_TIMEOUT_MS:
+        return f"가속도 샘플 {stalled_ms}ms 동안 없음 (I2C 읽기 불가 {accel_errors}회)"
+    return None
+
+def set_pressure_sampling(active):
+    """기압 샘플링 켜기/끄기 (켤 때 이전 샘플은 버림)"""
+    global _pressure_active
+    if active and not _pressure_active: pressure_ring.clear()
+    _pressure_active = active
+
+def request_accel_activity(active):
+    """가속도 ODR 변경 요청 (I2C0 버스를 사용하는 코어1 루프에서 적용)"""
+    global _accel_activity_request
+    _accel_activity_request = active
+
+def discard_accel_samples():
+    """쌓인 가속도 샘플 버림 (IDLE 복귀 시 - 모니터링/재생 중에는 링 버퍼를 비우지 않으므로 이전 세션 샘플이 남음)"""
+    accel_ring.clear()
+
+def check_for_movement():
+    """쌓인 가속도 샘플을 모두 처리하여 하나라도 임계값을 넘으면 True"""
+    is_moving = False
+    while accel_ring.pop(_accel_out):
+        if motion_sensor.process_accel_sample(_accel_out[1], _accel_out[2], _accel_out[3]): is_moving = True
+    return is_moving
+
+def get_pressure_reading(min_samples=1, timeout_ms=config.ACQ_PRESSURE_TIMEOUT_MS, oss=None):
+    """지난 호출 이후 수집된 기압 샘플의 평균 (Pa), min_samples 개가 모일 때까지 최대 timeout_ms 대기
+
+    oss 를 지정하면 다른 오버샘플링 단계로 변환된 샘플은 버림 (프로파일 변경 시점에 이미 진행 중이던 변환 포함).
+    """
+    total = 0.0; count = 0
+    start_ticks = utime.ticks_ms()
+    while True:
+        while pressure_ring.pop(_pressure_out):
+            if oss is None or _pressure_out[2] == oss: total += _pressure_out[1]; count += 1
+        if count >= min_samples or utime.ticks_diff(utime.ticks_ms(), start_ticks) >= timeout_ms: break
+        utime.sleep_ms(5)
+    if count == 0: _log("기압 샘플 없음"); return None
+    return total / count
@@ -83,12 +83,14 @@ def play_wav(log_callback=None):
             wav_file.seek(data_start)
             remaining_data = data_size
             buffer = bytearray(config.I2S_BUFFER_SIZE)
+            buffer_mv = memoryview(buffer)
             while remaining_data > 0:
                 read_size = min(config.I2S_BUFFER_SIZE, remaining_data)
-                num_read = wav_file.readinto(buffer, read_size)
-                if num_read == 0: break
+                # 버퍼 전체를 채우는 경우 슬라이스(메모리 할당) 없이 그대로 사용
+                num_read = wav_file.readinto(buffer if read_size == config.I2S_BUFFER_SIZE else buffer_mv[:read_size])
+                if not num_read: break
                 try:
-                    written = temp_i2s.write(memoryview(buffer)[:num_read])
+                    written = temp_i2s.write(buffer if num_read == config.I2S_BUFFER_SIZE else buffer_mv[:num_read])
                     bytes_written += written
                     if written != num_read:
                         _log(f"I2S 쓰기 불완전: {written}/{num_read}")
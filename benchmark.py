@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# 펌웨어 핫패스 마이크로 벤치마크
+#   보드 (MicroPython): import benchmark; benchmark.run(save=True)  /  benchmark.run(compare=True)
+#   호스트 (CPython):   python benchmark.py [--save] [--compare] [--scale 0.5]
+#                       host/ 의 가상 하드웨어(machine, utime, 가상 센서) 사용
+# 측정 항목: 호출당 시간(us), 힙 할당(bytes), I2C 트랜잭션 수
+#   힙 할당 - 보드: gc 비활성화 상태의 gc.mem_alloc() 증가량 / 호출 수
+#             호스트: tracemalloc 으로 측정한 호출 중 최대 임시 할당량 (호출당 평균 아님)
+#   정상 상태(steady state) 루프 항목(_ZERO_ALLOC)은 보드에서 할당이 있으면 회귀로 처리
+import sys
+import os
+import gc
+_ON_DEVICE = sys.implementation.name == 'micropython'
+if not _ON_DEVICE:
+    import tracemalloc
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import json
+import struct
+import utime
+import machine
+import config
+
+BASELINE_FILE = "bench_baseline_%s.json" % sys.platform
+REGRESSION_RATIO = 1.10 # 기준 대비 10% 이상 느려지면 회귀로 표시
+_BENCH_WAV_FILE = "bench.wav"
+_BENCH_LOG_FILE = "bench_log.txt"
+_BENCH_CAL_FILE = "bench_accel_cal.json"
+_BENCH_WAV_RATE = 8000
+_BENCH_WAV_SAMPLES = 2000 # 0.25초
+
+# (이름, 기본 반복 횟수)
+_ITERATIONS = {
+    'check_for_movement': 500,
+    'check_low_battery': 2000,
+    'bmp280_pressure': 500,
+    'pressure_to_altitude': 2000,
+    'log_event': 50,
+    'find_wav_data_chunk': 200,
+    'play_wav': 3,
+}
+# 메인 루프 IDLE 경로에서 호출되어 메모리 할당이 없어야 하는 항목
+_ZERO_ALLOC = ('check_for_movement', 'check_low_battery')
+
+class _CountingI2C:
+    """I2C 트랜잭션 수를 세는 래퍼 (보드/호스트 공통)"""
+    def __init__(self, bus):
+        self._bus = bus; self.count = 0
+
+    def scan(self):
+        self.count += 1; return self._bus.scan()
+
+    def readfrom_mem(self, addr, memaddr, nbytes, *args):
+        self.count += 1; return self._bus.readfrom_mem(addr, memaddr, nbytes, *args)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, *args):
+        self.count += 1; return self._bus.readfrom_mem_into(addr, memaddr, buf, *args)
+
+    def writeto_mem(self, addr, memaddr, buf, *args):
+        self.count += 1; return self._bus.writeto_mem(addr, memaddr, buf, *args)
+
+    def deinit(self): self._bus.deinit()
+
+def _quiet_log(message): pass
+
+def _remove(path):
+    try: os.remove(path)
+    except OSError: pass
+
+def _write_bench_wav():
+    """벤치마크용 무음 WAV 파일 생성 (16비트 모노)"""
+    data_size = _BENCH_WAV_SAMPLES * 2
+    with open(_BENCH_WAV_FILE, "wb") as f:
+        f.write(b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE')
+        f.write(b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, _BENCH_WAV_RATE, _BENCH_WAV_RATE * 2, 2, 16))
+        f.write(b'data' + struct.pack('<I', data_size))
+        chunk = bytes(512)
+        for _ in range(data_size // len(chunk)): f.write(chunk)
+        f.write(bytes(data_size % len(chunk)))
+
+def _setup_hardware():
+    if not _ON_DEVICE:
+        import fake_devices
+        fake_devices.install()
+    i2c0 = machine.I2C(config.I2C0_BUS_ID, scl=machine.Pin(config.PIN_I2C0_SCL), sda=machine.Pin(config.PIN_I2C0_SDA), freq=config.I2C0_FREQ)
+    i2c1 = machine.SoftI2C(scl=machine.Pin(config.PIN_I2C1_SCL), sda=machine.Pin(config.PIN_I2C1_SDA), freq=config.I2C1_FREQ)
+    return _CountingI2C(i2c0), _CountingI2C(i2c1)
+
+def _measure(func, iterations, buses, repeats=3):
+    """호출당 시간(반복 중 최솟값), 힙 할당, I2C 트랜잭션 측정"""
+    func() # 워밍업 (지연 임포트, 캐시 등)
+    for bus in buses: bus.count = 0
+    best_us = None; alloc = 0
+    for _ in range(repeats):
+        gc.collect()
+        if _ON_DEVICE: gc.disable()
+        heap_before = gc.mem_alloc() if _ON_DEVICE else 0
+        start = utime.ticks_us()
+        for _ in range(iterations): func()
+        elapsed_us = utime.ticks_diff(utime.ticks_us(), start)
+        if _ON_DEVICE:
+            alloc = (gc.mem_alloc() - heap_before) / iterations
+            gc.enable()
+        if best_us is None or elapsed_us < best_us: best_us = elapsed_us
+    i2c = sum(bus.count for bus in buses) / (iterations * repeats)
+    if not _ON_DEVICE:
+        # 시간 측정에 영향을 주지 않도록 할당량은 별도 실행으로 측정
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        for _ in range(iterations): func()
+        alloc = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+    return {'us_per_call': best_us / iterations, 'alloc_bytes': alloc, 'i2c_per_call': i2c}
+
+def _benchmarks(i2c0, i2c1):
+    """(이름, 함수, 관련 버스) 목록 생성"""
+    import motion_sensor
+    import pressure_sensor
+    import audio_player
+    import main
+    from bmp280 import BMP280, BMP280_OS_STANDARD
+
+    config.ACCEL_CAL_FILE = _BENCH_CAL_FILE # 실제 보정값 캐시를 건드리지 않도록
+    config.LOG_FILE_NAME = _BENCH_LOG_FILE
+    config.WAV_FILE_PATH = _BENCH_WAV_FILE
+    _write_bench_wav()
+
+    if not motion_sensor.init(i2c0, _quiet_log, force_recalibrate=True):
+        raise RuntimeError("LSM6DS3 초기화 실패")
+    sensor = BMP280(i2c1, addr=config.BMP280_ADDR, use_case=None)
+    sensor.oversample(BMP280_OS_STANDARD)
+    sensor.force_measure()
+    utime.sleep_ms(sensor.read_wait_ms or 20)
+
+    return [
+        ('check_for_movement', motion_sensor.check_for_movement, (i2c0,)),
+        ('check_low_battery', main.check_low_battery, ()),
+        ('bmp280_pressure', lambda: sensor.pressure, (i2c1,)),
+        ('pressure_to_altitude', lambda: pressure_sensor.pressure_to_altitude(100000.0), ()),
+        ('log_event', lambda: main.log_event("benchmark"), ()),
+        ('find_wav_data_chunk', lambda: audio_player._find_wav_data_chunk(_BENCH_WAV_FILE), ()),
+        ('play_wav', lambda: audio_player.play_wav(_quiet_log), ()),
+    ]
+
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path, "r") as f: return json.load(f)
+    except (OSError, ValueError): return None
+
+def compare(results, baseline):
+    """기준 결과와 비교하여 회귀 항목 이름 목록 반환"""
+    regressions = []
+    print("%-22s %12s %12s %8s" % ("benchmark", "base us", "now us", "ratio"))
+    for name, now in results['results'].items():
+        base = baseline['results'].get(name)
+        if base is None: print("%-22s %12s %12.1f" % (name, "-", now['us_per_call'])); continue
+        ratio = now['us_per_call'] / base['us_per_call'] if base['us_per_call'] else 0.0
+        flag = ""
+        if ratio > REGRESSION_RATIO: flag = " <- 회귀"; regressions.append(name)
+        if now['alloc_bytes'] > base['alloc_bytes']: flag += " (할당 증가)"
+        if now['i2c_per_call'] > base['i2c_per_call']: flag += " (I2C 증가)"
+        print("%-22s %12.1f %12.1f %8.2f%s" % (name, base['us_per_call'], now['us_per_call'], ratio, flag))
+    return regressions
+
+def run(save=False, compare_baseline=False, scale=1.0, only=None):
+    """전체 벤치마크 실행 후 결과 dict 반환"""
+    i2c0, i2c1 = _setup_hardware()
+    results = {'platform': sys.platform, 'implementation': sys.implementation.name, 'results': {}}
+    alloc_violations = []
+    try:
+        for name, func, buses in _benchmarks(i2c0, i2c1):
+            if only and name not in only: continue
+            iterations = max(1, int(_ITERATIONS[name] * scale))
+            r = _measure(func, iterations, buses)
+            results['results'][name] = r
+            print("%-22s %10.1f us  %8.1f B  %5.2f i2c  (x%d)" % (name, r['us_per_call'], r['alloc_bytes'], r['i2c_per_call'], iterations))
+            if _ON_DEVICE and name in _ZERO_ALLOC and r['alloc_bytes'] > 0:
+                print("%-22s 정상 상태 경로에서 메모리 할당 발생" % name); alloc_violations.append(name)
+    finally:
+        for path in (_BENCH_WAV_FILE, _BENCH_LOG_FILE, _BENCH_CAL_FILE): _remove(path)
+    if compare_baseline:
+        baseline = load_baseline()
+        if baseline is None: print("기준 결과 없음: %s" % BASELINE_FILE)
+        else: results['regressions'] = compare(results, baseline)
+    if alloc_violations: results['regressions'] = results.get('regressions', []) + alloc_violations
+    if save:
+        with open(BASELINE_FILE, "w") as f: json.dump(results, f)
+        print("기준 결과 저장: %s" % BASELINE_FILE)
+    return results
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    scale = 1.0
+    if '--scale' in args: scale = float(args[args.index('--scale') + 1])
+    result = run(save='--save' in args, compare_baseline='--compare' in args, scale=scale)
+    if result.get('regressions'): sys.exit(1)
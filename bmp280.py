@@ -115,6 +115,11 @@ class BMP280:
         self._p_raw = 0
         self._p = 0
 
+        # preallocated I2C buffers (no heap allocation per measurement)
+        self._data_buf = bytearray(6)
+        self._p_buf = bytearray(3)
+        self._w_buf = bytearray(1)
+
         self.read_wait_ms = 0  # interval between forced measure and readout
         self._new_read_ms = 200  # interval between
         self._last_read_ts = 0
@@ -127,13 +132,15 @@ class BMP280:
 
     def _write(self, addr, b_arr):
         if not type(b_arr) is bytearray:
-            b_arr = bytearray([b_arr])
+            self._w_buf[0] = b_arr
+            b_arr = self._w_buf
         return self._bmp_i2c.writeto_mem(self._i2c_addr, addr, b_arr)
 
     def _gauge(self):
         # TODO limit new reads
         # read all data at once (as by spec)
-        d = self._read(_BMP280_REGISTER_DATA, 6)
+        d = self._data_buf
+        self._bmp_i2c.readfrom_mem_into(self._i2c_addr, _BMP280_REGISTER_DATA, d)
 
         self._p_raw = (d[0] << 12) + (d[1] << 4) + (d[2] >> 4)
         self._t_raw = (d[3] << 12) + (d[4] << 4) + (d[5] >> 4)
@@ -195,10 +202,29 @@ class BMP280:
             self._t = ((self._t_fine * 5 + 128) >> 8) / 100.
         return self._t
 
+    @property
+    def t_fine(self):
+        # t_fine of the last gauge (valid after reading temperature or pressure)
+        return self._t_fine
+
     @property
     def pressure(self):
-        # From datasheet page 22
         self._calc_t_fine()
+        return self._calc_p()
+
+    def pressure_with_t_fine(self, t_fine):
+        # Pressure compensation reusing a previously measured t_fine,
+        # for conversions run with temperature oversampling skipped
+        d = self._p_buf
+        self._bmp_i2c.readfrom_mem_into(self._i2c_addr, _BMP280_REGISTER_DATA, d)
+        self._p_raw = (d[0] << 12) + (d[1] << 4) + (d[2] >> 4)
+        self._t_fine = t_fine
+        self._t = 0
+        self._p = 0
+        return self._calc_p()
+
+    def _calc_p(self):
+        # From datasheet page 22
         if self._p == 0:
             var1 = self._t_fine - 128000
             var2 = var1 * var1 * self._P6
@@ -303,6 +329,10 @@ class BMP280:
     def force_measure(self):
         self.power_mode = BMP280_POWER_FORCED
 
+    def force_measure_os(self, p_os, t_os):
+        # Oversampling and forced mode in a single register write
+        self._write(_BMP280_REGISTER_CONTROL, BMP280_POWER_FORCED + (p_os << 2) + (t_os << 5))
+
     def normal_measure(self):
         self.power_mode = BMP280_POWER_NORMAL
 
@@ -319,4 +349,4 @@ class BMP280:
     def oversample(self, oss):
         assert 0 <= oss <= 4
         p_os, t_os, self.read_wait_ms = _BMP280_OS_MATRIX[oss]
-        self._write_bits(_BMP280_REGISTER_CONTROL, p_os + (t_os << 3), 2)
\ No newline at end of file
+        self._write_bits(_BMP280_REGISTER_CONTROL, p_os + (t_os << 3), 6, 2)
\ No newline at end of file
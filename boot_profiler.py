@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import utime
+import config
+
+# 부팅 단계별 타임스탬프 기록 (리셋 이후 경과 시간 기준)
+# 기록 공간은 미리 할당하여 부팅 중 불필요한 메모리 할당을 줄임
+_MAX_PHASES = 16
+_phase_names = [None] * _MAX_PHASES
+_phase_ticks = [0] * _MAX_PHASES
+_phase_count = 0
+_start_ticks = 0
+
+def start():
+    """프로파일링 시작 시점 기록 (main.py 최상단에서 호출)"""
+    global _phase_count, _start_ticks
+    _phase_count = 0
+    _start_ticks = utime.ticks_us()
+
+def mark(phase_name):
+    """초기화 단계 완료 시점 기록"""
+    global _phase_count
+    if not config.BOOT_PROFILE_ENABLED or _phase_count >= _MAX_PHASES: return
+    _phase_names[_phase_count] = phase_name
+    _phase_ticks[_phase_count] = utime.ticks_us()
+    _phase_count += 1
+
+def elapsed_ms():
+    """프로파일링 시작 후 경과 시간 (ms)"""
+    return utime.ticks_diff(utime.ticks_us(), _start_ticks) // 1000
+
+def report(log_func=None):
+    """단계별 소요 시간과 감시 시작(armed)까지의 총 시간 출력"""
+    if not config.BOOT_PROFILE_ENABLED or _phase_count == 0: return
+    out = log_func if log_func else print
+    # ticks_us는 리셋 시 0부터 시작하므로 시작 시점 값 자체가 인터프리터 기동 시간
+    out(f"[BootProfiler] 리셋 후 main 진입: {_start_ticks // 1000}ms")
+    prev = _start_ticks
+    for i in range(_phase_count):
+        phase_ms = utime.ticks_diff(_phase_ticks[i], prev) // 1000
+        total_ms = utime.ticks_diff(_phase_ticks[i], _start_ticks) // 1000
+        out(f"[BootProfiler] {_phase_names[i]}: +{phase_ms}ms (누적 {total_ms}ms)")
+        prev = _phase_ticks[i]
@@ -22,21 +22,53 @@ I2C1_FREQ = 100000
 LSM6DS3_ADDR = 0x6A
 REG_CTRL1_XL = 0x10
 REG_CTRL2_G = 0x11    # 자이로 사용 시 필요
+REG_CTRL6_C = 0x15    # XL_HM_MODE (가속도계 고성능 모드 해제 비트)
+REG_CTRL8_XL = 0x17   # 가속도계 HPF/슬로프 필터 설정
 REG_STATUS = 0x1E
 REG_OUTX_L_XL = 0x28
 REG_OUTX_L_G = 0x22
+REG_WHO_AM_I = 0x0F
+LSM6DS3_WHO_AM_I = (0x69, 0x6A) # WHO_AM_I 허용값 (LSM6DS3, LSM6DS3TR-C) - 그 외 값이면 버스 스캔으로 확인
+# 장치 주소가 고정된 경우 I2C 버스 전체 스캔 대신 WHO_AM_I 1회 읽기로 확인 (부팅 시간 단축)
+LSM6DS3_SKIP_SCAN = True
 # 센서 감도 및 ODR 설정 (ULP 모드 고려 - 12.5Hz 유지 또는 더 낮게 설정 가능)
 ACCEL_SENSITIVITY = 0.061   # mg/LSB
 # GYRO_SENSITIVITY = 4.375    # 자이로 사용 시 필요
 ACCEL_ODR_CONFIG = b'\x10' # 12.5 Hz, ±2g (ULP 모드)
 GYRO_ODR_CONFIG = b'\x00'  # 12.5 Hz, ±125 dps (b'\x12) (자이로 비활성화 시 b'\x00')
+ACCEL_LOW_POWER_MODE = True # IDLE 에서 저전력 모드 사용 (CTRL6_C XL_HM_MODE=1), 모니터링/재생 중에는 고성능 모드 (적응형 ODR 미사용 시 항상 저전력)
+# 적응형 ODR: IDLE 에서는 ACCEL_ODR_CONFIG(12.5Hz), 기압 모니터링/재생 중에는 아래 ODR
+# (LSM6DS3TR-C(0x6A) 는 저전력 모드에서 1.6Hz(b'\xB0') 도 지원하나 LSM6DS3(0x69) 에는 없고, IDLE 판정/코어1 수집 주기가 12.5Hz 기준이므로 12.5Hz 사용)
+ACCEL_ADAPTIVE_ODR = True
+ACCEL_ODR_ACTIVE_CONFIG = b'\x30' # 52 Hz, ±2g
+# 하드웨어 HPF: 칩이 중력을 제거한 동적 가속도를 출력 (소프트웨어 중력 필터, 오프셋 보정/캐시 생략)
+ACCEL_HW_HPF_ENABLED = False
+ACCEL_HPF_CONFIG = b'\x24' # HP_SLOPE_XL_EN=1, HPCF_XL=01 (차단 주파수 ODR/100: 12.5Hz 에서 0.125Hz)
+ACCEL_HPF_SETTLE_MS = 3000 # HPF 활성화 후 필터 출력 안정화 대기 (이 동안 움직임 판정 안 함)
 # 필터 및 오프셋
 OFFSET_SAMPLE_COUNT = 50
 # GYRO_LPF_ALPHA = 0.2    # 자이로 사용 시 필요
-GRAVITY_FILTER_ALPHA = 0.1 # 중력 제거용 HPF(LPF 기반)
+GRAVITY_FILTER_ALPHA = 0.1 # 중력 제거용 HPF(LPF 기반) - 소프트웨어 필터 사용 시
 # 가속도 감지 임계값 (동적 가속도 기준, mg) - **민감한 반응, 작은 값 튜닝 필요**
 MOTION_THRESHOLD_MG = 150
 
+# --- 가속도 보정값 캐시 (플래시 저장) ---
+REG_OUT_TEMP_L = 0x20
+LSM6DS3_TEMP_SENSITIVITY = 16.0 # LSB/°C (25°C 기준 0)
+ACCEL_CAL_FILE = "accel_cal.json"
+ACCEL_CAL_FORCE_FILE = "recalibrate" # 이 파일이 있으면 부팅 시 강제 재보정 후 삭제
+# 저장된 오프셋 벡터 크기 허용 범위 (mg) - 오프셋에는 정지 상태의 중력(1g)이 포함됨
+ACCEL_CAL_GRAVITY_MIN_MG = 850
+ACCEL_CAL_GRAVITY_MAX_MG = 1150
+ACCEL_CAL_MAX_BOOTS = 200 # 보정 후 부팅 횟수 한도 (RTC가 없으므로 부팅 횟수로 경과 판단, 부팅 횟수는 보정값 갱신 저장 시에만 기록)
+ACCEL_CAL_MAX_TEMP_DELTA_C = 15.0 # 보정 시점과의 온도 차 한도 (None이면 온도 검사 안 함)
+# 정지 구간 백그라운드 보정
+ACCEL_CAL_REFINE_ENABLED = True
+ACCEL_CAL_REFINE_STILL_MG = 30 # 동적 가속도 크기가 이 값 미만이면 정지로 판단
+ACCEL_CAL_REFINE_SAMPLES = 50 # 연속 정지 샘플 수 (IDLE 주기 기준 약 10초)
+ACCEL_CAL_REFINE_ALPHA = 0.2 # 보정값 갱신 가중치
+ACCEL_CAL_SAVE_INTERVAL_MS = 3600000 # 플래시 기록 최소 간격 (플래시 수명 보호)
+
 # --- BMP280 설정 ---
 BMP280_ADDR = 0x76  # BMP280 기본 주소
 PRESSURE_AVG_SAMPLES = 3   # 기압 측정 시 평균낼 샘플 수
@@ -46,6 +78,36 @@ PRESSURE_MONITOR_INTERVAL_MS = 1000 # 기압 모니터링 간격 (ms)
 PRESSURE_MONITOR_TIMEOUT_MS = PRESSURE_MONITOR_INTERVAL_MS * 5
 # 표준 해수면 기압 (Pa) - 고도 계산용 참조값
 SEA_LEVEL_PRESSURE_PA = 101325.0
+# 적응형 측정 프로파일 (오버샘플링 단계: 0=ULTRALOW(P x1), 1=LOW(x2), 2=STANDARD(x4), 3=HIGH(x8), 4=ULTRAHIGH(x16))
+BMP280_OSS_DEFAULT = 2 # 적응형 미사용 시 (STANDARD)
+BMP280_ADAPTIVE_OSS = True
+BMP280_OSS_COARSE = 1 # 움직임 감지 직후 및 모니터링 중 1차 측정 (LOW)
+BMP280_OSS_FINE = 3 # 고도 변화가 임계값 근처일 때 재확인 측정 (HIGH)
+BMP280_FINE_CHECK_RATIO = 0.7 # 고도 변화가 임계값 x 이 비율 이상이면 고정밀 재측정
+# 온도 변환 생략 (캐시된 t_fine 재사용)
+BMP280_TEMP_SKIP_ENABLED = True
+BMP280_TEMP_STABLE_DELTA_C = 0.2 # 직전 온도와 차이가 이 값 이하이면 안정으로 판단
+BMP280_TEMP_MAX_INTERVAL = 8 # 온도 안정 시 최대 N회 측정마다 1회 온도 변환
+BMP280_TEMP_MAX_AGE_MS = 60000 # 캐시된 t_fine 최대 사용 시간
+# 고도 추세(수직 속도) 검출 - 최근 고도 샘플의 선형 회귀로 꾸준한 인양을 조기 감지
+TREND_ENABLED = False # True 이면 추세로 알람 판정 (단순 임계값은 큰 급변에만 적용)
+TREND_WINDOW_SAMPLES = 8 # 회귀 윈도우 (모니터링 간격 1초 기준 약 8초)
+TREND_MIN_SAMPLES = 4 # 판정에 필요한 최소 샘플 수
+TREND_MIN_SPEED_MPS = 0.1 # 최소 수직 속도 (m/s)
+TREND_MIN_R2 = 0.8 # 최소 결정계수 (추세가 설명하는 고도 변동 비율)
+TREND_MIN_T_STAT = 4.0 # 최소 기울기 t 통계량 (기울기 / 표준오차)
+TREND_LOOKAHEAD_S = 2.0 # 예상 변화량 계산 시 외삽 시간 (s) - 이만큼 먼저 알람
+TREND_MAX_EXTEND_MS = 120000 # 추세로 모니터링 타임아웃을 연장할 수 있는 한도 (세션 시작 기준, 이후에는 알람만 타임아웃을 연장)
+TREND_PERSIST_SAMPLES = 2 # 추세 사용 시 단순 임계값 알람은 고도 변화가 임계값 이상으로 이 샘플 수만큼 연속 유지되어야 함 (돌풍 제외)
+
+# --- 코어1 센서 수집 (RP2040 듀얼 코어) ---
+ACQ_ENABLED = False # True 이면 코어1 스레드가 센서를 샘플링하고 메인 루프는 링 버퍼에서 소비
+ACQ_ACCEL_PERIOD_MS = 80 # 가속도 샘플링 주기 (12.5Hz ODR)
+ACQ_PRESSURE_PERIOD_MS = 100 # 기압 샘플링 주기 (모니터링 중에만 동작)
+ACQ_ACCEL_RING_SIZE = 32 # 링 버퍼 크기 (샘플 수)
+ACQ_PRESSURE_RING_SIZE = 32
+ACQ_PRESSURE_TIMEOUT_MS = 500 # 기압 샘플 대기 최대 시간
+ACQ_STALL_TIMEOUT_MS = 2000 # 이 시간 동안 가속도 샘플이 없으면 코어1 수집 이상으로 보고 코어0 직접 측정으로 전환
 
 # --- I2S 및 WAV 설정 ---
 I2S_ID = 0
@@ -55,6 +117,20 @@ PIN_I2S_SD = 16
 I2S_BUFFER_SIZE = 2048
 WAV_FILE_PATH = "/wav/tower_crane_warning_fast.wav"
 
+# --- UART 텔레메트리 설정 ---
+TELEMETRY_ENABLED = False
+TELEMETRY_UART_ID = 1 # UART0 기본 핀(GP0/GP1)은 I2C0이 사용
+PIN_TELEMETRY_TX = 4 # GP4
+PIN_TELEMETRY_RX = 5 # GP5
+TELEMETRY_BAUDRATE = 115200
+TELEMETRY_TXBUF = 1024 # UART 송신 버퍼 (bytes)
+TELEMETRY_QUEUE_SLOTS = 16 # 미리 할당된 송신 큐 크기 (프레임 수)
+TELEMETRY_MAX_FRAMES_PER_POLL = 8 # 메인 루프 1회당 최대 전송 프레임 수
+TELEMETRY_ACCEL_EVERY_N = 5 # IDLE 가속도 검사 N회마다 1회 동적 가속도 크기 전송
+# 처리량 (8N1 = 바이트당 10비트, 115200 baud = 11520 B/s, 프레임 오버헤드 7B):
+#   상태/배터리(13B) 약 886 msg/s, 가속도(15B) 약 768 msg/s, 기압(19B) 약 606 msg/s
+#   (telemetry_protocol.frames_per_second 로 계산)
+
 # --- 전압 관련 설정 ---
 VOLTAGE_DIVIDER_RATIO = 3.0    # 전압 (V)
 ADC_REF_VOLTAGE = 3.3    # 전압 (V)
@@ -71,5 +147,15 @@ STATE_ACTION = 3            # 오디오 재생 중
 STATE_LOW_BATT = 4
 STATE_ERROR = 5
 
+# --- 메모리 관리 (정상 상태 루프 무할당) ---
+LOG_DEFER_SLOTS = 16 # 지연 기록 로그 슬롯 수 (가득 차면 즉시 기록)
+GC_COLLECT_INTERVAL_MS = 10000 # 유휴 구간 gc.collect() 최소 간격
+GC_MIN_FREE_BYTES = 32768 # 남은 힙이 이보다 적으면 간격과 무관하게 다음 유휴 구간에서 수집
+HEAP_MONITOR_ENABLED = False # 루프 1회당 할당량/최대 힙 사용량 계측 (gc.mem_alloc 사용)
+HEAP_REPORT_INTERVAL_MS = 600000 # 힙 리포트 로그 간격 (10분)
+
+# --- 부팅 프로파일러 ---
+BOOT_PROFILE_ENABLED = True # 초기화 단계별 소요 시간을 로그로 기록
+
 # --- 저전력 설정 ---
 IDLE_SLEEP_MS = 200 # STATE_IDLE 상태에서 MCU sleep 시간 (ms)
\ No newline at end of file
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import gc
+import utime
+from array import array
+import config
+
+# 메인 루프 힙 계측 및 유휴 구간 gc 예약
+# 루프 1회(핫패스)의 할당량을 상태별로 집계하고, gc.collect()는 유휴 구간에서만 실행하여
+# 자동 수집이 I2S 재생이나 센서 측정 도중에 일어나지 않도록 함.
+# gc.mem_alloc() 이 없는 환경(CPython 호스트, 참조 카운트 기반)에서는 모든 함수가 아무 동작도 하지 않음.
+_SUPPORTED = hasattr(gc, 'mem_alloc')
+_MAX_STATES = 8 # 상태 코드(config.STATE_*) 별 통계 슬롯
+
+# 통계 공간은 미리 할당 (계측 자체가 할당하지 않도록)
+_iterations = array('i', [0] * _MAX_STATES)
+_alloc_iterations = array('i', [0] * _MAX_STATES) # 할당이 발생한 루프 수
+_alloc_total = array('i', [0] * _MAX_STATES)
+_alloc_max = array('i', [0] * _MAX_STATES) # 루프 1회 최대 할당량
+_iter_state = -1 # 계측 중인 루프의 상태 (-1 이면 계측 중 아님)
+_iter_start = 0
+high_water = 0 # 마지막 리포트 이후 최대 힙 사용량 (bytes)
+collections = 0 # 예약 실행한 gc 횟수
+_last_collect_ticks = 0
+_last_report_ticks = 0
+
+def init():
+    """계측 시작 시점 초기화 (메인 루프 진입 전 호출)"""
+    global _last_collect_ticks, _last_report_ticks, high_water
+    if not _SUPPORTED: return
+    gc.collect()
+    _last_collect_ticks = _last_report_ticks = utime.ticks_ms()
+    high_water = gc.mem_alloc()
+    _reset_stats()
+
+def _reset_stats():
+    for i in range(_MAX_STATES):
+        _iterations[i] = _alloc_iterations[i] = _alloc_total[i] = _alloc_max[i] = 0
+
+def begin_iteration(state):
+    """루프 1회 계측 시작"""
+    global _iter_state, _iter_start
+    if not _SUPPORTED or not config.HEAP_MONITOR_ENABLED: return
+    _iter_state = state if 0 <= state < _MAX_STATES else _MAX_STATES - 1
+    _iter_start = gc.mem_alloc()
+
+def end_iteration():
+    """루프 1회 계측 종료 (유휴 구간 진입 시 또는 루프 끝에서 호출, 중복 호출 무시)"""
+    global _iter_state, high_water
+    if _iter_state < 0: return
+    state = _iter_state; _iter_state = -1
+    used = gc.mem_alloc()
+    if used > high_water: high_water = used
+    delta = used - _iter_start
+    _iterations[state] += 1
+    if delta > 0: # 음수이면 루프 중 자동 gc 발생 (집계 제외)
+        _alloc_iterations[state] += 1; _alloc_total[state] += delta
+        if delta > _alloc_max[state]: _alloc_max[state] = delta
+
+def collect(now_ms=None):
+    """즉시 gc 실행 (블로킹 작업 직전 등 유휴 구간에서 호출)"""
+    global _last_collect_ticks, collections
+    if not _SUPPORTED: return
+    gc.collect(); collections += 1
+    _last_collect_ticks = utime.ticks_ms() if now_ms is None else now_ms
+
+def collect_if_due(now_ms):
+    """유휴 구간: 간격이 지났거나 남은 힙이 적으면 gc 실행"""
+    if not _SUPPORTED: return False
+    if utime.ticks_diff(now_ms, _last_collect_ticks) < config.GC_COLLECT_INTERVAL_MS and gc.mem_free() >= config.GC_MIN_FREE_BYTES:
+        return False
+    collect(now_ms); return True
+
+def report_if_due(now_ms, log_func=None):
+    """유휴 구간: 리포트 간격이 지났으면 상태별 루프 할당량과 최대 힙 사용량을 기록"""
+    global _last_report_ticks, high_water
+    if not _SUPPORTED or not config.HEAP_MONITOR_ENABLED: return
+    if utime.ticks_diff(now_ms, _last_report_ticks) < config.HEAP_REPORT_INTERVAL_MS: return
+    _last_report_ticks = now_ms
+    out = log_func if log_func else print
+    out(f"[HeapMonitor] 최대 사용량 {high_water}B, 여유 {gc.mem_free()}B, 예약 gc {collections}회")
+    for state in range(_MAX_STATES):
+        n = _iterations[state]
+        if n == 0: continue
+        out(f"[HeapMonitor] 상태 {state}: 루프 {n}회, 할당 발생 {_alloc_iterations[state]}회, "
+            f"평균 {_alloc_total[state] / n:.1f}B/회, 최대 {_alloc_max[state]}B/회")
+    high_water = gc.mem_alloc()
+    _reset_stats()
+
+def alloc_per_iteration(state):
+    """상태별 루프 1회 평균 할당량 (bytes, 회귀 확인용)"""
+    n = _iterations[state]
+    return _alloc_total[state] / n if n else 0.0
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# 호스트(CPython)용 가상 센서 (LSM6DS3, BMP280)
+# 레지스터 수준으로 동작하므로 motion_sensor / bmp280 코드를 수정 없이 실행 가능
+import errno
+import math
+import struct
+import machine
+import utime
+
+LSM6DS3_WHO_AM_I = 0x69
+BMP280_CHIP_ID = 0x58
+
+# LSM6DS3 CTRL1_XL ODR_XL 코드 -> Hz, CTRL8_XL HPCF_XL 코드 -> 차단 주파수 분모 (ODR/n)
+_LSM6DS3_ODR_HZ = {1: 12.5, 2: 26.0, 3: 52.0, 4: 104.0, 5: 208.0, 6: 416.0, 7: 833.0, 8: 1660.0}
+_LSM6DS3_HPCF_DIV = (4, 100, 9, 400)
+
+# BMP280 데이터시트 예제 보정값 (bmp280.BMP280.load_test_calibration 과 동일)
+_BMP280_TEST_CALIBRATION = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+
+
+class FakeLSM6DS3:
+    """가속도 샘플을 sample_source() (mg 단위 x, y, z) 에서 가져오는 가상 LSM6DS3"""
+
+    def __init__(self, sample_source=None, sensitivity=0.061, temperature_c=25.0):
+        self.registers = bytearray(0x80)
+        self.registers[0x0F] = LSM6DS3_WHO_AM_I
+        self.sample_source = sample_source or (lambda: (0.0, 0.0, 1000.0))
+        self.sensitivity = sensitivity
+        self.temperature_c = temperature_c
+        self.fault = False # True 이면 모든 접근에서 OSError
+        self.reads = 0
+        self.odr_changes = 0
+        self._hp_lowpass = None # HPF 에뮬레이션 상태 (입력의 저역 성분, mg)
+        self._hp_us = 0
+
+    def _check_fault(self):
+        if self.fault: raise OSError(errno.EIO)
+
+    def _raw(self, mg):
+        return max(-32768, min(32767, int(round(mg / self.sensitivity))))
+
+    def read(self, reg, n):
+        self._check_fault()
+        self.reads += 1
+        if reg == 0x28: # OUTX_L_XL
+            x, y, z = self._high_pass(self.sample_source())
+            data = struct.pack('<hhh', self._raw(x), self._raw(y), self._raw(z))
+            return data[:n]
+        if reg == 0x20: # OUT_TEMP_L (16 LSB/°C, 25°C = 0)
+            return struct.pack('<h', int((self.temperature_c - 25.0) * 16))[:n]
+        return bytes(self.registers[reg:reg + n])
+
+    def _high_pass(self, sample):
+        """CTRL8_XL HP_SLOPE_XL_EN 설정 시 1차 HPF 출력 (상태는 0에서 시작하므로 활성화 직후 중력 과도 응답 발생)"""
+        ctrl8 = self.registers[0x17]
+        odr = _LSM6DS3_ODR_HZ.get(self.registers[0x10] >> 4)
+        if not ctrl8 & 0x04 or not odr: self._hp_lowpass = None; return sample
+        now = utime.now_us()
+        if self._hp_lowpass is None: self._hp_lowpass = [0.0, 0.0, 0.0]; self._hp_us = now
+        cutoff_hz = odr / _LSM6DS3_HPCF_DIV[ctrl8 >> 5 & 0x3]
+        alpha = 1.0 - math.exp(-2.0 * math.pi * cutoff_hz * (now - self._hp_us) / 1000000.0)
+        self._hp_us = now
+        out = []
+        for i in range(3):
+            self._hp_lowpass[i] += alpha * (sample[i] - self._hp_lowpass[i])
+            out.append(sample[i] - self._hp_lowpass[i])
+        return out
+
+    def write(self, reg, data):
+        self._check_fault()
+        if reg == 0x10 and bytes(data[:1]) != bytes(self.registers[0x10:0x11]): self.odr_changes += 1
+        self.registers[reg:reg + len(data)] = data
+
+
+def _bmp280_t_fine(t_raw, T1, T2, T3):
+    var1 = (((t_raw >> 3) - (T1 << 1)) * T2) >> 11
+    var2 = (((((t_raw >> 4) - T1) * ((t_raw >> 4) - T1)) >> 12) * T3) >> 14
+    return var1 + var2
+
+def _bmp280_pressure(p_raw, t_fine, cal):
+    _, _, _, P1, P2, P3, P4, P5, P6, P7, P8, P9 = cal
+    var1 = t_fine - 128000
+    var2 = var1 * var1 * P6
+    var2 = var2 + ((var1 * P5) << 17)
+    var2 = var2 + (P4 << 35)
+    var1 = ((var1 * var1 * P3) >> 8) + ((var1 * P2) << 12)
+    var1 = (((1 << 47) + var1) * P1) >> 33
+    if var1 == 0: return 0
+    p = 1048576 - p_raw
+    p = int((((p << 31) - var2) * 3125) / var1)
+    var1 = (P9 * (p >> 13) * (p >> 13)) >> 25
+    var2 = (P8 * p) >> 19
+    return (((p + var1 + var2) >> 8) + (P7 << 4)) / 256.0
+
+
+class FakeBMP280:
+    """pressure_pa / temperature_c 속성 값을 원시 ADC 값으로 역변환해 돌려주는 가상 BMP280"""
+
+    def __init__(self, pressure_pa=101325.0, temperature_c=20.0):
+        self.cal = _BMP280_TEST_CALIBRATION
+        self.registers = bytearray(0x100)
+        self.registers[0xD0] = BMP280_CHIP_ID
+        self.registers[0x88:0xA0] = struct.pack('<HhhHhhhhhhhh', *self.cal)
+        self.pressure_pa = pressure_pa
+        self.temperature_c = temperature_c
+        self.pressure_source = None # 설정 시 측정마다 pressure_pa 대신 호출
+        self.fault = False
+        self.conversions = 0
+        self.temperature_conversions = 0
+        self._cache_key = None
+        self._cache_raw = (0x80000, 0x80000)
+        self._store_data(0x80000, 0x80000)
+
+    def _store_data(self, p_raw, t_raw):
+        self.registers[0xF7:0xFD] = bytes((p_raw >> 12 & 0xFF, p_raw >> 4 & 0xFF, (p_raw & 0xF) << 4,
+                                           t_raw >> 12 & 0xFF, t_raw >> 4 & 0xFF, (t_raw & 0xF) << 4))
+
+    def _raw_values(self, pressure_pa, temperature_c):
+        key = (round(pressure_pa, 2), round(temperature_c, 2))
+        if key == self._cache_key: return self._cache_raw
+        T1, T2, T3 = self.cal[:3]
+        # t_fine 은 t_raw 에 대해 단조 증가 -> 이분 탐색
+        target_t_fine = int(temperature_c * 5120)
+        lo, hi = 0, (1 << 20) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _bmp280_t_fine(mid, T1, T2, T3) < target_t_fine: lo = mid + 1
+            else: hi = mid
+        t_raw = lo; t_fine = _bmp280_t_fine(t_raw, T1, T2, T3)
+        # 압력은 p_raw 에 대해 단조 감소 -> 이분 탐색
+        lo, hi = 0, (1 << 20) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _bmp280_pressure(mid, t_fine, self.cal) > pressure_pa: lo = mid + 1
+            else: hi = mid
+        self._cache_key = key; self._cache_raw = (lo, t_raw)
+        return self._cache_raw
+
+    def _convert(self):
+        ctrl = self.registers[0xF4]
+        osrs_p = ctrl >> 2 & 0x7; osrs_t = ctrl >> 5 & 0x7
+        pressure = self.pressure_source() if self.pressure_source else self.pressure_pa
+        p_raw, t_raw = self._raw_values(pressure, self.temperature_c)
+        self.conversions += 1
+        if osrs_t: self.temperature_conversions += 1
+        self._store_data(p_raw if osrs_p else 0x80000, t_raw if osrs_t else 0x80000)
+
+    def read(self, reg, n):
+        if self.fault: raise OSError(errno.EIO)
+        return bytes(self.registers[reg:reg + n])
+
+    def write(self, reg, data):
+        if self.fault: raise OSError(errno.EIO)
+        for i, value in enumerate(data):
+            r = reg + i
+            if r == 0xE0 and value == 0xB6: # 소프트 리셋
+                self.registers[0xF4] = 0; self.registers[0xF5] = 0; continue
+            self.registers[r] = value
+            if r == 0xF4 and (value & 0x3) in (1, 2): # forced 모드: 변환 후 sleep 으로 복귀
+                self._convert(); self.registers[0xF4] = value & 0xFC
+
+
+def install(lsm6ds3=None, bmp280=None, lsm6ds3_addr=0x6A, bmp280_addr=0x76):
+    """가상 센서를 machine.i2c_devices 에 등록하고 (lsm6ds3, bmp280) 반환"""
+    lsm6ds3 = lsm6ds3 or FakeLSM6DS3()
+    bmp280 = bmp280 or FakeBMP280()
+    machine.i2c_devices.clear()
+    machine.i2c_devices[lsm6ds3_addr] = lsm6ds3
+    machine.i2c_devices[bmp280_addr] = bmp280
+    return lsm6ds3, bmp280
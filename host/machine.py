@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# 호스트(CPython)용 machine 대체 모듈
+# I2C 장치는 i2c_devices 에 주소별로 등록 (host/fake_devices.py 참고)
+import errno
+import utime
+
+i2c_devices = {} # 주소 -> 가상 장치 (모든 버스 공용)
+adc_source = None # ADC.read_u16 값을 돌려주는 함수 (None 이면 4.0V 상당)
+i2s_listener = None # I2S 이벤트 콜백 (event, i2s 객체)
+sleep_listener = None # lightsleep 콜백 (ms)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, pin_id, mode=-1, pull=-1, value=None):
+        self.id = pin_id; self._value = value or 0
+
+    def value(self, v=None):
+        if v is None: return self._value
+        self._value = 1 if v else 0
+
+    def on(self): self._value = 1
+    def off(self): self._value = 0
+    def toggle(self): self._value ^= 1
+
+
+class ADC:
+    def __init__(self, pin):
+        self.pin = pin
+
+    def read_u16(self):
+        if adc_source is not None: return adc_source()
+        return int(4.0 / 3.0 / 3.3 * 65535) # VSYS 4.0V (분압비 3)
+
+
+class I2C:
+    def __init__(self, bus_id=-1, scl=None, sda=None, freq=400000, timeout=50000):
+        self.bus_id = bus_id; self.freq = freq
+        self.transactions = 0
+
+    def _device(self, addr):
+        self.transactions += 1
+        device = i2c_devices.get(addr)
+        if device is None: raise OSError(errno.ENODEV)
+        return device
+
+    def scan(self):
+        self.transactions += 1
+        return sorted(i2c_devices)
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        return bytes(self._device(addr).read(memaddr, nbytes))
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        buf[:] = self._device(addr).read(memaddr, len(buf))
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self._device(addr).write(memaddr, bytes(buf))
+
+    def deinit(self): pass
+
+
+class SoftI2C(I2C):
+    def __init__(self, scl=None, sda=None, freq=400000, timeout=50000):
+        super().__init__(-1, scl, sda, freq, timeout)
+
+
+class I2S:
+    TX = 0
+    RX = 1
+    MONO = 0
+    STEREO = 1
+
+    def __init__(self, i2s_id, sck=None, ws=None, sd=None, mode=TX, bits=16, format=MONO, rate=8000, ibuf=2048):
+        self.rate = rate; self.bits = bits; self.bytes_written = 0
+        self._bytes_per_second = rate * bits // 8 * (2 if format == I2S.STEREO else 1)
+        if i2s_listener: i2s_listener('init', self)
+
+    def write(self, buf):
+        n = len(buf)
+        self.bytes_written += n
+        # 가상 시계에서는 실제 I2S 처럼 재생 시간만큼 시계를 진행 (실제 시간 모드에서는 대기하지 않음)
+        if utime.is_virtual(): utime.sleep_us(n * 1000000 // self._bytes_per_second)
+        return n
+
+    def deinit(self):
+        if i2s_listener: i2s_listener('deinit', self)
+
+
+class UART:
+    def __init__(self, uart_id, baudrate=115200, tx=None, rx=None, txbuf=256, **kwargs):
+        self.baudrate = baudrate
+        self.written = bytearray()
+
+    def write(self, buf):
+        self.written.extend(buf); return len(buf)
+
+    def txdone(self): return True
+
+    def read(self, n=-1): return None
+
+    def any(self): return 0
+
+
+def lightsleep(ms=None):
+    if sleep_listener: sleep_listener(ms)
+    utime.sleep_ms(ms or 0)
+
+def deepsleep(ms=None): lightsleep(ms)
+
+def freq(hz=None): return 125000000
+
+def reset(): raise SystemExit("machine.reset()")
+
+def unique_id(): return b'\x00\x00\x00\x00\x00\x00\x00\x01'
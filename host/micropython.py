@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# 호스트(CPython)용 micropython 대체 모듈
+
+def const(value): return value
+
+def alloc_emergency_exception_buf(size): pass
+
+def mem_info(verbose=None): pass
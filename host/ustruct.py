@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+# 호스트(CPython)용 ustruct 대체 모듈
+from struct import *  # noqa: F401,F403
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# 호스트(CPython)용 utime 대체 모듈
+# 기본은 실제 시간, set_virtual_clock() 호출 시 가상 시간 (sleep 은 대기 없이 시계만 진행)
+import time as _time
+
+_TICKS_PERIOD = 1 << 30
+_TICKS_MAX = _TICKS_PERIOD - 1
+_TICKS_HALFPERIOD = _TICKS_PERIOD // 2
+
+_virtual_us = None # None 이면 실제 시간 사용
+_call_cost_us = 0 # 가상 시간에서 ticks 호출 1회당 진행 시간 (CPU 실행 시간 모사)
+_epoch_offset = 0
+_deadline_us = None # 가상 시계가 이 시각에 도달하면 KeyboardInterrupt (시뮬레이션 종료용, 1회)
+
+def set_virtual_clock(start_us=0, call_cost_us=0):
+    """가상 시계로 전환"""
+    global _virtual_us, _call_cost_us
+    _virtual_us = start_us; _call_cost_us = call_cost_us
+
+def is_virtual(): return _virtual_us is not None
+
+def set_deadline_us(deadline_us):
+    """가상 시계가 deadline_us 에 도달하면 ticks/sleep 호출에서 KeyboardInterrupt 를 1회 발생 (None 이면 해제)"""
+    global _deadline_us
+    _deadline_us = deadline_us
+
+def _check_deadline():
+    global _deadline_us
+    if _deadline_us is not None and _virtual_us >= _deadline_us:
+        _deadline_us = None; raise KeyboardInterrupt
+
+def set_real_clock():
+    global _virtual_us
+    _virtual_us = None
+
+def advance_us(us):
+    """가상 시계를 us 만큼 진행 (실제 시간 모드에서는 대기)"""
+    global _virtual_us
+    if _virtual_us is None: _time.sleep(us / 1000000); return
+    _virtual_us += us
+    _check_deadline()
+
+def peek_us():
+    """현재 시간 (us) - 가상 시계에서 호출 비용을 더하지 않음 (시뮬레이터/가상 장치용)"""
+    if _virtual_us is None: return _time.perf_counter_ns() // 1000
+    return _virtual_us
+
+def now_us():
+    """순환(wrap)하지 않는 현재 시간 (us)"""
+    global _virtual_us
+    if _virtual_us is None: return _time.perf_counter_ns() // 1000
+    _virtual_us += _call_cost_us
+    _check_deadline()
+    return _virtual_us
+
+def ticks_us(): return now_us() & _TICKS_MAX
+def ticks_ms(): return (now_us() // 1000) & _TICKS_MAX
+def ticks_cpu(): return ticks_us()
+
+def ticks_add(ticks, delta): return (ticks + delta) & _TICKS_MAX
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALFPERIOD) & _TICKS_MAX) - _TICKS_HALFPERIOD
+
+def sleep_us(us): advance_us(us)
+def sleep_ms(ms): advance_us(ms * 1000)
+def sleep(seconds): advance_us(int(seconds * 1000000))
+
+def time():
+    if _virtual_us is None: return int(_time.time())
+    return _epoch_offset + _virtual_us // 1000000
+
+def localtime(secs=None):
+    return _time.localtime(time() if secs is None else secs)[:8]
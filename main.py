@@ -1,10 +1,19 @@
 # -*- coding: utf-8 -*-
-import machine
 import utime
+import boot_profiler
+boot_profiler.start()
+import machine
+from array import array
 import config
+import heap_monitor
 import motion_sensor
 import pressure_sensor # 기압 센서 모듈 추가
-import audio_player
+if config.TELEMETRY_ENABLED: import telemetry # 텔레메트리 사용 시에만 로드
+if config.ACQ_ENABLED: import acquisition # 코어1 센서 수집 사용 시에만 로드
+if config.TREND_ENABLED: import trend_detector # 고도 추세 검출 사용 시에만 로드
+# audio_player는 부팅 후 첫 유휴 구간에서 로드 (부팅 시간 단축, 알람 경로에서는 임포트하지 않음)
+audio_player = None
+boot_profiler.mark("모듈 임포트")
 
 # --- 전역 변수 ---
 led = machine.Pin(config.PIN_LED, machine.Pin.OUT)
@@ -15,23 +24,95 @@ i2c1 = None # BMP280용
 current_state = config.STATE_INIT
 last_log_ticks = 0
 low_batt_warning_active = False
+acq_active = False # 코어1 센서 수집 동작 여부
+_audio_load_attempts = 0
+# 정수 연산용 전압 환산 계수 (mV) - 배터리 검사에서 float 할당 방지
+_VSYS_MV_SCALE = int(config.ADC_REF_VOLTAGE * config.VOLTAGE_DIVIDER_RATIO * 1000 + 0.5)
+_LOW_BATT_MV = int(config.LOW_BATT_THRESHOLD * 1000 + 0.5)
+# 지연 기록 로그 슬롯 (핫패스에서는 서식 문자열과 인자만 저장, 유휴 구간에 서식화/파일 기록)
+_deferred_ticks = array('i', [0] * config.LOG_DEFER_SLOTS)
+_deferred_mv = array('i', [0] * config.LOG_DEFER_SLOTS)
+_deferred_templates = [None] * config.LOG_DEFER_SLOTS
+_deferred_args = [None] * (config.LOG_DEFER_SLOTS * 3)
+_deferred_count = 0
 
-# --- 유틸리티 함수 (log_event, init_led, set_led_state, check_voltage, check_low_battery) ---
-def log_event(event):
+# --- 유틸리티 함수 (log_event, log_deferred, flush_log, init_led, set_led_state, change_state, check_voltage, check_low_battery) ---
+def _format_log_entry(ticks, voltage, event):
     global last_log_ticks
+    # ticks_ms 사용: ticks_us는 약 17.9분 주기로 순환하여 긴 간격의 상대 시간이 왜곡됨
+    if last_log_ticks == 0: relative_time_ms = 0
+    else: relative_time_ms = utime.ticks_diff(ticks, last_log_ticks)
+    last_log_ticks = ticks
+    return f"[{relative_time_ms}ms],[{voltage:.2f}V] | {event}\n"
+
+def log_event(event):
     try:
-        voltage = check_voltage()
-        current_ticks = utime.ticks_us()
-        if last_log_ticks == 0: relative_time_ms = 0
-        else: relative_time_ms = utime.ticks_diff(current_ticks, last_log_ticks) // 1000
-        last_log_ticks = current_ticks
-        log_entry = f"[{relative_time_ms}ms],[{voltage:.2f}V] | {event}\n"
+        flush_log() # 지연 기록 로그를 먼저 기록하여 순서 유지
+        log_entry = _format_log_entry(utime.ticks_ms(), check_voltage(), event)
         print(log_entry, end="")
         try:
             with open(config.LOG_FILE_NAME, "a") as file: file.write(log_entry)
         except Exception as fe: print(f"로그 파일 작성 실패: {fe}")
     except Exception as e: print(f"로그 파일 기록 실패: {e}")
 
+def log_deferred(template, a=None, b=None, c=None):
+    """핫패스용 로그: 시각/전압과 인자만 슬롯에 저장 (template.format(a, b, c) 는 flush_log 에서)"""
+    global _deferred_count
+    if _deferred_count >= config.LOG_DEFER_SLOTS: flush_log()
+    i = _deferred_count
+    _deferred_ticks[i] = utime.ticks_ms(); _deferred_mv[i] = check_voltage_mv()
+    _deferred_templates[i] = template
+    _deferred_args[i * 3] = a; _deferred_args[i * 3 + 1] = b; _deferred_args[i * 3 + 2] = c
+    _deferred_count = i + 1
+
+def flush_log():
+    """지연 기록 로그를 서식화하여 파일에 한 번에 기록 (유휴 구간에서 호출)"""
+    global _deferred_count
+    if _deferred_count == 0: return
+    try: file = open(config.LOG_FILE_NAME, "a")
+    except Exception as fe: print(f"로그 파일 작성 실패: {fe}"); file = None
+    try:
+        for i in range(_deferred_count):
+            try: event = _deferred_templates[i].format(_deferred_args[i * 3], _deferred_args[i * 3 + 1], _deferred_args[i * 3 + 2])
+            except Exception as e: event = f"{_deferred_templates[i]} (서식 오류: {e})"
+            log_entry = _format_log_entry(_deferred_ticks[i], _deferred_mv[i] / 1000, event)
+            print(log_entry, end="")
+            if file: file.write(log_entry)
+    except Exception as e: print(f"로그 파일 기록 실패: {e}")
+    finally:
+        if file: file.close()
+        for i in range(_deferred_count * 3): _deferred_args[i] = None # 인자 참조 해제
+        _deferred_count = 0
+
+def idle_window(now_ms):
+    """유휴 구간 작업: 핫패스 계측 종료, 지연 로그 기록, 코어1 수집 상태 확인, 오디오 모듈 로드, 예약 gc, 힙 리포트"""
+    heap_monitor.end_iteration()
+    flush_log()
+    if acq_active: check_acquisition(now_ms)
+    if audio_player is None and _audio_load_attempts < 3: load_audio_player()
+    heap_monitor.collect_if_due(now_ms)
+    heap_monitor.report_if_due(now_ms, log_event)
+
+def check_acquisition(now_ms):
+    """코어1 스레드가 멈췄거나 가속도 샘플이 끊기면 기록 후 코어0 직접 측정으로 전환 (감시 공백 방지)"""
+    global acq_active
+    problem = acquisition.health_problem(now_ms)
+    if problem is None: return
+    log_event(f"코어1 수집 실패: {problem} -> 코어0 직접 측정으로 전환")
+    acquisition.stop(); acq_active = False
+    # ODR 은 코어1 에서 적용하던 것을 코어0 에서 다시 적용
+    motion_sensor.set_activity(current_state == config.STATE_MONITORING_PRESSURE or current_state == config.STATE_ACTION)
+
+def load_audio_player():
+    """audio_player 모듈 로드 (감시 시작 후 유휴 구간에서 호출, 실패 시 다음 유휴 구간에서 최대 3회까지 재시도)"""
+    global audio_player, _audio_load_attempts
+    _audio_load_attempts += 1
+    heap_monitor.collect() # 모듈 컴파일/로드 전 힙 확보
+    try:
+        import audio_player as module
+        audio_player = module
+    except Exception as e: log_event(f"오디오 모듈 로드 실패 ({_audio_load_attempts}회): {e}")
+
 def init_led(): led.off()
 
 def set_led_state(state):
@@ -41,26 +122,55 @@ def set_led_state(state):
     elif state == config.STATE_ACTION: led.on() # 재생 중 LED ON
     else: led.off()
 
-def check_voltage():
-    try:
-        adc_value = adc.read_u16(); return adc_value * config.ADC_REF_VOLTAGE / 65535 * config.VOLTAGE_DIVIDER_RATIO
-    except Exception: return 0.0
+def change_state(new_state):
+    """상태 전환: LED 갱신 및 텔레메트리로 상태 전이 전송"""
+    global current_state
+    if config.TELEMETRY_ENABLED and new_state != current_state: telemetry.send_state(current_state, new_state)
+    current_state = new_state
+    set_led_state(new_state)
+    active = new_state == config.STATE_MONITORING_PRESSURE or new_state == config.STATE_ACTION
+    # 코어1 수집 중에는 I2C0 버스를 코어1이 사용하므로 ODR 변경도 코어1에서 적용
+    if acq_active:
+        acquisition.set_pressure_sampling(active); acquisition.request_accel_activity(active)
+        # 가속도 샘플은 IDLE 에서만 꺼내므로 세션 동안 쌓인 샘플로 곧바로 재트리거되지 않도록 버림
+        if new_state == config.STATE_IDLE: acquisition.discard_accel_samples()
+    else: motion_sensor.set_activity(active) # 가속도 ODR: 모니터링/재생 중 상향, IDLE 최저
+
+def read_pressure(num_samples=config.PRESSURE_AVG_SAMPLES, oss=None):
+    """평균 기압 측정 (Pa): 코어1 수집 중이면 링 버퍼의 샘플 평균 (oss 지정 시 해당 오버샘플링 샘플만), 아니면 직접 측정"""
+    if acq_active: return acquisition.get_pressure_reading(num_samples, oss=oss)
+    return pressure_sensor.get_pressure_reading(num_samples)
+
+def read_pressure_fine():
+    """임계값 근처 재확인용 고정밀 측정 후 저정밀(coarse) 프로파일로 복귀"""
+    pressure_sensor.set_oversampling(config.BMP280_OSS_FINE)
+    pressure = read_pressure(oss=config.BMP280_OSS_FINE) # 코어1 이 이미 시작한 저정밀 변환 샘플은 제외
+    pressure_sensor.set_oversampling(config.BMP280_OSS_COARSE)
+    return pressure
+
+def check_voltage_mv():
+    """VSYS 전압 (mV, 정수 연산으로 메모리 할당 없음)"""
+    try: return adc.read_u16() * _VSYS_MV_SCALE // 65535
+    except Exception: return 0
+
+def check_voltage(): return check_voltage_mv() / 1000
 
 def check_low_battery():
     global low_batt_warning_active
-    voltage = check_voltage()
-    low_now = voltage > 0 and voltage < config.LOW_BATT_THRESHOLD
+    voltage_mv = check_voltage_mv()
+    if config.TELEMETRY_ENABLED: telemetry.send_battery(voltage_mv)
+    low_now = voltage_mv > 0 and voltage_mv < _LOW_BATT_MV
     if low_now and not low_batt_warning_active:
-        log_event(f"저전력 경고: {voltage:.2f}V"); low_batt_warning_active = True; set_led_state(config.STATE_LOW_BATT)
+        log_event(f"저전력 경고: {voltage_mv / 1000:.2f}V"); low_batt_warning_active = True; set_led_state(config.STATE_LOW_BATT)
     elif not low_now and low_batt_warning_active:
-        log_event(f"저전력 상태 해제: {voltage:.2f}V"); low_batt_warning_active = False; set_led_state(current_state)
+        log_event(f"저전력 상태 해제: {voltage_mv / 1000:.2f}V"); low_batt_warning_active = False; set_led_state(current_state)
     return low_now
 
 # --- 메인 실행 로직 ---
 def main():
-    global current_state, last_log_ticks, i2c0, i2c1
+    global current_state, last_log_ticks, i2c0, i2c1, acq_active
 
-    last_log_ticks = utime.ticks_us()
+    last_log_ticks = utime.ticks_ms()
     log_event("시스템 시작")
     init_led()
     current_state = config.STATE_INIT
@@ -71,104 +181,157 @@ def main():
         i2c1 = machine.SoftI2C(scl=machine.Pin(config.PIN_I2C1_SCL), sda=machine.Pin(config.PIN_I2C1_SDA), freq=config.I2C1_FREQ)   # I2C 설정 오류로 SoftI2C를 설정함. 이유 모름..
         log_event("I2C 버스 초기화 완료 (Bus 0, Bus 1)")
     except Exception as e:
-        log_event(f"I2C 버스 초기화 실패: {e}"); current_state = config.STATE_ERROR; set_led_state(config.STATE_ERROR); return
+        log_event(f"I2C 버스 초기화 실패: {e}"); change_state(config.STATE_ERROR); return
+    boot_profiler.mark("I2C 초기화")
+    if config.TELEMETRY_ENABLED:
+        telemetry.init(log_event) # 실패해도 감시 동작에는 영향 없음
+        boot_profiler.mark("텔레메트리 초기화")
 
     if check_low_battery(): log_event("초기 전압 낮음.")
 
     # 센서 초기화
     motion_ok = motion_sensor.init(i2c0, log_event)
-    pressure_ok = pressure_sensor.init(i2c1, log_event)
+    boot_profiler.mark("가속도 센서 초기화")
+    pressure_ok = pressure_sensor.init(i2c1, log_event, log_deferred)
+    boot_profiler.mark("기압 센서 초기화")
 
     if not motion_ok or not pressure_ok:
-        log_event("센서 초기화 실패. 프로그램 중단."); current_state = config.STATE_ERROR; set_led_state(config.STATE_ERROR)
+        log_event("센서 초기화 실패. 프로그램 중단."); change_state(config.STATE_ERROR)
         while True: utime.sleep(1) # 오류 상태 유지
 
+    if config.ACQ_ENABLED:
+        acq_active = acquisition.start(log_event) # 실패 시 코어0 직접 측정으로 동작
+        boot_profiler.mark("코어1 수집 시작")
+
     log_event("모든 센서 초기화 완료. 메인 루프 시작.")
-    current_state = config.STATE_IDLE
-    set_led_state(current_state)
+    change_state(config.STATE_IDLE)
+    boot_profiler.mark("감시 시작(armed)")
+    boot_profiler.report(log_event)
 
     initial_altitude = None
+    step_persist_count = 0 # 추세 사용 시 고도 변화가 임계값 이상으로 연속 유지된 샘플 수
     pressure_monitor_start_time = None
+    monitor_session_start_time = None # 모니터링 세션 시작 시각 (추세에 의한 타임아웃 연장 한도 기준)
     last_pressure_check_time = None
     last_batt_check_time = utime.ticks_ms()
+    accel_telemetry_count = 0
+    heap_monitor.init()
 
     while True:
         try:
             current_time_ms = utime.ticks_ms()
+            heap_monitor.begin_iteration(current_state)
 
             # 배터리 체크
             if utime.ticks_diff(current_time_ms, last_batt_check_time) > 5000:
                 check_low_battery()
                 last_batt_check_time = current_time_ms
 
+            if config.TELEMETRY_ENABLED: telemetry.poll()
+
             # --- 상태별 처리 ---
             if current_state == config.STATE_IDLE:
-                is_triggered = motion_sensor.check_for_movement()
+                is_triggered = acquisition.check_for_movement() if acq_active else motion_sensor.check_for_movement()
+                if config.TELEMETRY_ENABLED:
+                    accel_telemetry_count += 1
+                    if is_triggered or accel_telemetry_count >= config.TELEMETRY_ACCEL_EVERY_N:
+                        telemetry.send_accel(motion_sensor.dynamic_magnitude_mg()); accel_telemetry_count = 0
                 if is_triggered:
                     log_event("움직임 감지 -> 기압 모니터링 시작")
-                    # 초기 기압 및 고도 측정
-                    initial_pressure = pressure_sensor.get_pressure_reading()
+                    # 초기 기압 및 고도 측정 (적응형 프로파일: 1차 측정은 저정밀로 빠르게)
+                    if config.BMP280_ADAPTIVE_OSS: pressure_sensor.set_oversampling(config.BMP280_OSS_COARSE)
+                    if acq_active: acquisition.set_pressure_sampling(True)
+                    initial_pressure = read_pressure()
                     if initial_pressure is not None:
                         initial_altitude = pressure_sensor.pressure_to_altitude(initial_pressure)
                         if initial_altitude is not None:
                             log_event(f"초기 고도 설정: {initial_altitude:.2f} m (P={initial_pressure:.1f} Pa)")
-                            current_state = config.STATE_MONITORING_PRESSURE
-                            set_led_state(current_state)
-                            pressure_monitor_start_time = last_pressure_check_time = current_time_ms
+                            if config.TELEMETRY_ENABLED: telemetry.send_pressure(initial_pressure, initial_altitude)
+                            if config.TREND_ENABLED: trend_detector.reset(); trend_detector.add_sample(current_time_ms, initial_altitude); step_persist_count = 0
+                            change_state(config.STATE_MONITORING_PRESSURE)
+                            pressure_monitor_start_time = last_pressure_check_time = monitor_session_start_time = current_time_ms
                         else:
                             log_event("초기 고도 계산 실패")
                             # 상태는 IDLE 유지
                     else:
                         log_event("초기 기압 측정 실패")
                         # 상태는 IDLE 유지
+                    if acq_active and current_state == config.STATE_IDLE: acquisition.set_pressure_sampling(False)
                 else:
+                    idle_window(current_time_ms)
                     # 가속도 미감지 시 저전력 Sleep
-                    machine.lightsleep(config.IDLE_SLEEP_MS)
+                    # (코어1 수집 중이거나 텔레메트리 송신 중에는 클럭 유지를 위해 일반 sleep)
+                    if not acq_active and (not config.TELEMETRY_ENABLED or telemetry.is_idle()): machine.lightsleep(config.IDLE_SLEEP_MS)
+                    else: utime.sleep_ms(config.IDLE_SLEEP_MS)
 
             elif current_state == config.STATE_MONITORING_PRESSURE:
                 # 모니터링 간격 확인
                 if utime.ticks_diff(current_time_ms, last_pressure_check_time) >= config.PRESSURE_MONITOR_INTERVAL_MS:
                     # 기압 측정 및 고도 변화 확인
-                    current_pressure = pressure_sensor.get_pressure_reading()
+                    # 코어1 수집 중에는 지난 측정 이후 쌓인 샘플 전체의 평균 (최소 1개)
+                    current_pressure = read_pressure(1) if acq_active else read_pressure()
                     if current_pressure is not None and initial_altitude is not None:
                         current_altitude = pressure_sensor.pressure_to_altitude(current_pressure)
                         if current_altitude is not None:
                             last_pressure_check_time = current_time_ms
                             altitude_change = abs(current_altitude - initial_altitude)
-                            log_event(f"고도 변화 모니터링: 현재={current_altitude:.2f}m, 초기={initial_altitude:.2f}m, 변화량={altitude_change:.2f}m")
+                            # 임계값 근처일 때만 고정밀로 재측정하여 판정
+                            if config.BMP280_ADAPTIVE_OSS and altitude_change >= config.ALTITUDE_CHANGE_THRESHOLD * config.BMP280_FINE_CHECK_RATIO:
+                                fine_pressure = read_pressure_fine()
+                                fine_altitude = pressure_sensor.pressure_to_altitude(fine_pressure)
+                                if fine_altitude is not None:
+                                    current_pressure = fine_pressure; current_altitude = fine_altitude
+                                    altitude_change = abs(current_altitude - initial_altitude)
+                            if config.TELEMETRY_ENABLED: telemetry.send_pressure(current_pressure, current_altitude)
+                            log_deferred("고도 변화 모니터링: 현재={0:.2f}m, 초기={1:.2f}m, 변화량={2:.2f}m", current_altitude, initial_altitude, altitude_change)
 
-                            # 고도 변화 임계값 확인
-                            if altitude_change >= config.ALTITUDE_CHANGE_THRESHOLD:
-                                log_event(f"고도 변화 임계값 ({config.ALTITUDE_CHANGE_THRESHOLD}m) 도달! 음원 재생.")
+                            # 고도 변화 임계값 확인 (추세 사용 시 단순 임계값은 연속 샘플 동안 유지될 때만 적용 - 일시적 돌풍 제외)
+                            trend_alarm = False; step_alarm = altitude_change >= config.ALTITUDE_CHANGE_THRESHOLD
+                            if config.TREND_ENABLED:
+                                trend_detector.add_sample(current_time_ms, current_altitude)
+                                trend_alarm = trend_detector.lift_detected(initial_altitude)
+                                step_persist_count = step_persist_count + 1 if step_alarm else 0
+                                step_alarm = step_persist_count >= config.TREND_PERSIST_SAMPLES
+                                # 느린 인양이 진행 중이면 임계값에 도달하기 전에 타임아웃되지 않도록 모니터링 연장
+                                # (기상 변화 등 느린 드리프트로 무한 연장되지 않도록 세션 시작 후 TREND_MAX_EXTEND_MS 까지만)
+                                if trend_detector.trending and utime.ticks_diff(current_time_ms, monitor_session_start_time) < config.TREND_MAX_EXTEND_MS:
+                                    pressure_monitor_start_time = current_time_ms
+                            if trend_alarm or step_alarm:
+                                if not step_alarm:
+                                    log_event(f"고도 추세 임계값 도달 (속도 {trend_detector.vertical_speed:.2f}m/s, 신뢰도 R2={trend_detector.r_squared:.2f}, "
+                                              f"예상 변화량 {trend_detector.projected_change:.2f}m)! 음원 재생.")
+                                else: log_event(f"고도 변화 임계값 ({config.ALTITUDE_CHANGE_THRESHOLD}m) 도달! 음원 재생.")
                                 # 재생 전 상태를 ACTION으로 변경하고 LED 켬 (선택사항)
-                                current_state = config.STATE_ACTION
-                                set_led_state(current_state) # 재생 중 LED
-                                audio_player.play_wav(log_event)
+                                change_state(config.STATE_ACTION) # 재생 중 LED
+                                if config.TELEMETRY_ENABLED: telemetry.poll() # 재생(블로킹) 전에 상태 전이 전송
+                                heap_monitor.collect() # 재생(I2S 스트리밍) 도중 자동 gc가 일어나지 않도록 직전에 수집
+                                if audio_player: audio_player.play_wav(log_event)
+                                else: log_event("음원 재생 불가: 오디오 모듈 로드 실패")
                                 # 재생 후 다시 모니터링 상태 유지 및 LED 업데이트
-                                current_state = config.STATE_MONITORING_PRESSURE
-                                set_led_state(current_state)
+                                change_state(config.STATE_MONITORING_PRESSURE)
                                 # 임계 고도값 변화 시점의 고도값과, 기압 측정 시작 시간 초기값 설정
                                 initial_altitude = current_altitude
                                 pressure_monitor_start_time = current_time_ms
+                                # 추세 윈도우도 새 기준 고도에서 다시 시작 (이전 상승분으로 곧바로 재알람하지 않도록)
+                                if config.TREND_ENABLED: trend_detector.reset(); trend_detector.add_sample(current_time_ms, current_altitude); step_persist_count = 0
                         else: # 고도 계산 실패
                             log_event("현재 고도 계산 실패")
                     else: # 기압 측정 실패 또는 초기 고도 없음
                         log_event("현재 기압 측정 실패 또는 초기 고도 없음")
+                else: idle_window(current_time_ms) # 다음 측정까지 유휴 구간
 
                 # 모니터링 타임아웃 확인
                 if utime.ticks_diff(current_time_ms, pressure_monitor_start_time) > config.PRESSURE_MONITOR_TIMEOUT_MS:
                     log_event("기압 모니터링 타임아웃. IDLE 상태로 복귀.")
-                    current_state = config.STATE_IDLE
-                    set_led_state(current_state)
+                    change_state(config.STATE_IDLE)
 
             elif current_state == config.STATE_ACTION:
                 # 오디오 재생은 블로킹되므로, 이 상태에 오래 머물지 않음
                 # 혹시 모를 경우를 대비해 IDLE로 돌리는 로직 추가 가능
                 log_event("ACTION 상태 오류? IDLE로 강제 전환")
-                current_state = config.STATE_IDLE
-                set_led_state(current_state)
+                change_state(config.STATE_IDLE)
                 utime.sleep_ms(100)
-
+            heap_monitor.end_iteration()
 
             # 루프 지연 (Sleep이 없는 경우 대비)
             # 상태별로 필요한 최소 대기시간 고려
@@ -180,12 +343,12 @@ def main():
             break
         except Exception as e:
             log_event(f"메인 루프 오류 발생: {e}")
-            current_state = config.STATE_ERROR
-            set_led_state(config.STATE_ERROR)
+            change_state(config.STATE_ERROR)
             utime.sleep_ms(1000)
 
     # --- 종료 처리 ---
-    log_event("프로그램 종료 처리 시작")
+    log_event("프로그램 종료 처리 시작") # 남은 지연 기록 로그도 함께 기록됨
+    if acq_active: acquisition.stop() # I2C 해제 전에 코어1 수집 중지
     if i2c0: 
         try: i2c0.deinit()
         except Exception as e: log_event(f"I2C0 해제 중 오류: {e}")
@@ -2,49 +2,207 @@
 import utime
 import ustruct
 import math # 벡터 크기 계산용 sqrt
+import json
+import os
+from array import array
 import config
 
 # 모듈 전역 변수
 _i2c = None
 _log_func = None
-accel_offset = {'x': 0.0, 'y': 0.0, 'z': 0.0}
-gravity_estimate = {'x': 0.0, 'y': 0.0, 'z': 0.0}
-dynamic_accel = {'x': 0.0, 'y': 0.0, 'z': 0.0}
 is_initialized = False
+# 정상 상태 루프에서 메모리 할당이 없도록 버퍼/필터 상태를 미리 할당하고 정수(고정소수점)로 계산
+# 필터 값 단위: 원시 LSB x 2^_Q_SHIFT (float 연산은 MicroPython 에서 매번 힙에 할당됨)
+_Q_SHIFT = 4
+_accel_buf = bytearray(6)
+accel_raw = array('i', [0, 0, 0]) # 마지막으로 읽은 원시 가속도 (x, y, z)
+_offset_q = array('i', [0, 0, 0]) # 정지 상태 오프셋 (중력 포함)
+_gravity_q = array('i', [0, 0, 0]) # 중력 추정값
+_dynamic_q = array('i', [0, 0, 0]) # 동적 가속도
+_alpha_q8 = 0 # config 값에서 init 시 계산 (x/256)
+_motion_threshold_raw = 0
+_motion_threshold_sq = 0
+_still_threshold_sq = 0
+_refine_alpha_q8 = 0
+# 하드웨어 HPF / 적응형 ODR 상태
+_hw_hpf = False # True 이면 칩의 HPF 출력을 동적 가속도로 바로 사용
+_hpf_settle_until = 0 # HPF 안정화 완료 시각 (ticks_ms), 이전에는 움직임 판정 안 함
+_odr_active = False # 현재 높은 ODR(모니터링용) 사용 중인지
+# 보정값 캐시 상태
+_cal_boots = 0 # 보정 이후 부팅 횟수
+_cal_temp_c = None # 보정 시점 센서 온도
+_last_cal_save_ticks = 0
+_refine_sum = array('i', [0, 0, 0])
+_refine_count = 0
 
 def _log(message):
     if _log_func: _log_func(f"[MotionSensor] {message}")
     else: print(f"[MotionSensor] {message}")
 
-def init(i2c_bus, log_callback=None):
-    """센서 초기화 (가속도계만) 및 오프셋 계산"""
-    global _i2c, _log_func, is_initialized
+def init(i2c_bus, log_callback=None, force_recalibrate=False):
+    """센서 초기화 (가속도계만), 저장된 보정값 로드 또는 오프셋 계산"""
+    global _i2c, _log_func, is_initialized, _hw_hpf, _odr_active
     _i2c = i2c_bus; _log_func = log_callback; is_initialized = False
+    _hw_hpf = False; _odr_active = False
+    _init_thresholds()
     try:
-        devices = _i2c.scan()
-        if config.LSM6DS3_ADDR not in devices:
-            _log(f"LSM6DS3 센서 감지 실패"); return False
+        if not config.LSM6DS3_SKIP_SCAN or not _who_am_i_ok():
+            devices = _i2c.scan()
+            if config.LSM6DS3_ADDR not in devices:
+                _log(f"LSM6DS3 센서 감지 실패"); return False
         _i2c.writeto_mem(config.LSM6DS3_ADDR, config.REG_CTRL1_XL, config.ACCEL_ODR_CONFIG)
         utime.sleep_ms(10)
         _i2c.writeto_mem(config.LSM6DS3_ADDR, config.REG_CTRL2_G, config.GYRO_ODR_CONFIG) # 자이로 비활성화
+        _write_power_mode(False) # 시작 상태는 IDLE
         utime.sleep_ms(100)
         _log("LSM6DS3 레지스터 설정 완료 (Gyro Disabled)")
-        if not _calculate_accel_offsets_and_init_filters(): return False
+        if config.ACCEL_HW_HPF_ENABLED:
+            # 칩 내장 HPF가 중력(오프셋 포함)을 제거하므로 오프셋 보정/소프트웨어 필터 불필요
+            if not _enable_hw_hpf(): return False
+        elif force_recalibrate or _recalibration_requested() or not _load_calibration():
+            if not recalibrate(): return False
+        elif not _init_filters(): return False
         _log("LSM6DS3 초기화 완료 (Accel Only)"); is_initialized = True; return True
     except Exception as e: _log(f"초기화 중 오류: {e}"); return False
 
+def _who_am_i_ok():
+    """주소가 고정된 장치이므로 버스 스캔 없이 WHO_AM_I 1바이트만 확인 (알 수 없는 ID 이면 False -> 스캔으로 확인)"""
+    try: who_am_i = _i2c.readfrom_mem(config.LSM6DS3_ADDR, config.REG_WHO_AM_I, 1)[0]
+    except OSError: return False
+    if who_am_i in config.LSM6DS3_WHO_AM_I: return True
+    _log(f"LSM6DS3 WHO_AM_I 불일치: 0x{who_am_i:02X}, 버스 스캔으로 확인"); return False
+
+def _init_thresholds():
+    """config 값(mg, 비율)을 정수 연산용 값으로 변환 (init 시 1회)"""
+    global _alpha_q8, _motion_threshold_raw, _motion_threshold_sq, _still_threshold_sq, _refine_alpha_q8
+    _alpha_q8 = int(config.GRAVITY_FILTER_ALPHA * 256 + 0.5)
+    _motion_threshold_raw = int(config.MOTION_THRESHOLD_MG / config.ACCEL_SENSITIVITY)
+    _motion_threshold_sq = _motion_threshold_raw * _motion_threshold_raw
+    still_raw = int(config.ACCEL_CAL_REFINE_STILL_MG / config.ACCEL_SENSITIVITY)
+    _still_threshold_sq = still_raw * still_raw
+    _refine_alpha_q8 = int(config.ACCEL_CAL_REFINE_ALPHA * 256 + 0.5)
+
+def _enable_hw_hpf():
+    """LSM6DS3 HPF(CTRL8_XL) 활성화 - 출력 레지스터에 중력이 제거된 동적 가속도가 나옴"""
+    global _hw_hpf
+    try: _i2c.writeto_mem(config.LSM6DS3_ADDR, config.REG_CTRL8_XL, config.ACCEL_HPF_CONFIG)
+    except Exception as e: _log(f"HPF 설정 중 오류: {e}"); return False
+    _hw_hpf = True
+    _dynamic_q[0] = _dynamic_q[1] = _dynamic_q[2] = 0
+    _start_hpf_settle()
+    _log("하드웨어 HPF 사용 (소프트웨어 중력 필터/오프셋 보정 생략)"); return True
+
+def _start_hpf_settle():
+    """HPF 활성화 직후 필터 출력이 안정될 때까지 움직임 판정 보류"""
+    global _hpf_settle_until
+    _hpf_settle_until = utime.ticks_add(utime.ticks_ms(), config.ACCEL_HPF_SETTLE_MS)
+
+def _write_power_mode(active):
+    """XL_HM_MODE=1: IDLE(저 ODR) 에서 가속도계 저전력 모드, 모니터링/재생 중에는 고성능 모드"""
+    low_power = config.ACCEL_LOW_POWER_MODE and not active
+    _i2c.writeto_mem(config.LSM6DS3_ADDR, config.REG_CTRL6_C, b'\x10' if low_power else b'\x00')
+
+def apply_activity(active):
+    """가속도 ODR/전력 모드 변경 - 로그 없이 예외를 그대로 전달 (코어1 수집용)"""
+    global _odr_active
+    if not config.ACCEL_ADAPTIVE_ODR or active == _odr_active: return
+    _i2c.writeto_mem(config.LSM6DS3_ADDR, config.REG_CTRL1_XL, config.ACCEL_ODR_ACTIVE_CONFIG if active else config.ACCEL_ODR_CONFIG)
+    _write_power_mode(active)
+    _odr_active = active
+    # ODR 변경 시에는 HPF 안정화 대기 없음: 필터는 계속 동작 중이라 차단 주파수만 바뀌고 출력은 이미 중력이 제거된 상태
+    # (IDLE 복귀 때마다 대기하면 세션 직후 ACCEL_HPF_SETTLE_MS 동안 움직임 감지 불가, 가속도는 IDLE 에서만 읽음)
+
+def set_activity(active):
+    """상태에 맞춰 가속도 ODR 변경: 모니터링/재생 중에는 높은 ODR, IDLE 에서는 최저 ODR (저전력)"""
+    if not is_initialized: return
+    try: apply_activity(active)
+    except Exception as e: _log(f"ODR 변경 중 오류: {e}")
+
+def read_accel_sample(out=accel_raw):
+    """원시 가속도를 out 배열(x, y, z)에 읽기 - 메모리 할당 없음, 로그 없이 예외를 그대로 전달 (코어1 수집용)"""
+    _i2c.readfrom_mem_into(config.LSM6DS3_ADDR, config.REG_OUTX_L_XL, _accel_buf)
+    buf = _accel_buf
+    for i in range(3):
+        value = buf[2 * i] | (buf[2 * i + 1] << 8)
+        out[i] = value - 65536 if value & 0x8000 else value
+    return out
+
 def _read_accel_raw():
+    """accel_raw 갱신 (실패 시 0으로 채움)"""
+    try: read_accel_sample(accel_raw)
+    except Exception as e:
+        _log(f"가속도 읽기 오류: {e}"); accel_raw[0] = accel_raw[1] = accel_raw[2] = 0
+    return accel_raw
+
+def offset_mg():
+    """현재 오프셋 (mg) - 저장/로그용"""
+    scale = config.ACCEL_SENSITIVITY / (1 << _Q_SHIFT)
+    return {'x': _offset_q[0] * scale, 'y': _offset_q[1] * scale, 'z': _offset_q[2] * scale}
+
+def _set_offset_mg(x_mg, y_mg, z_mg):
+    scale = (1 << _Q_SHIFT) / config.ACCEL_SENSITIVITY
+    _offset_q[0] = int(round(x_mg * scale)); _offset_q[1] = int(round(y_mg * scale)); _offset_q[2] = int(round(z_mg * scale))
+
+def _read_temperature():
+    """LSM6DS3 내장 온도 센서 값 (°C), 실패 시 None"""
     try:
-        data = _i2c.readfrom_mem(config.LSM6DS3_ADDR, config.REG_OUTX_L_XL, 6)
-        ax = ustruct.unpack('<h', data[0:2])[0]
-        ay = ustruct.unpack('<h', data[2:4])[0]
-        az = ustruct.unpack('<h', data[4:6])[0]
-        return ax, ay, az
-    except Exception as e: _log(f"가속도 읽기 오류: {e}"); return 0, 0, 0
-
-def _calculate_accel_offsets_and_init_filters():
-    """가속도계 오프셋 계산 및 관련 필터 초기화"""
-    global accel_offset, gravity_estimate, dynamic_accel
+        data = _i2c.readfrom_mem(config.LSM6DS3_ADDR, config.REG_OUT_TEMP_L, 2)
+        return 25.0 + ustruct.unpack('<h', data)[0] / config.LSM6DS3_TEMP_SENSITIVITY
+    except Exception as e: _log(f"온도 읽기 오류: {e}"); return None
+
+def _recalibration_requested():
+    """강제 재보정 요청 파일 확인 (확인 후 삭제)"""
+    try: os.stat(config.ACCEL_CAL_FORCE_FILE)
+    except OSError: return False
+    try: os.remove(config.ACCEL_CAL_FORCE_FILE)
+    except OSError as e: _log(f"재보정 요청 파일 삭제 실패: {e}")
+    _log("강제 재보정 요청 확인"); return True
+
+def _load_calibration():
+    """플래시에 저장된 보정값 로드 및 유효성 검사 (범위, 부팅 횟수, 온도)"""
+    global _cal_boots, _cal_temp_c
+    try:
+        with open(config.ACCEL_CAL_FILE, "r") as f: cal = json.load(f)
+        ox, oy, oz = float(cal['x']), float(cal['y']), float(cal['z'])
+        boots = int(cal.get('boots', 0)) + 1; cal_temp = cal.get('temp')
+        if cal_temp is not None: cal_temp = float(cal_temp) # 손상된 값은 아래 except 로 재보정
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        _log(f"저장된 보정값 없음 또는 손상: {e}"); return False
+    magnitude = math.sqrt(ox * ox + oy * oy + oz * oz)
+    if not config.ACCEL_CAL_GRAVITY_MIN_MG <= magnitude <= config.ACCEL_CAL_GRAVITY_MAX_MG:
+        _log(f"저장된 보정값 범위 초과: |offset|={magnitude:.1f} mg"); return False
+    if boots > config.ACCEL_CAL_MAX_BOOTS:
+        _log(f"저장된 보정값 만료: 부팅 {boots}회"); return False
+    if config.ACCEL_CAL_MAX_TEMP_DELTA_C is not None and cal_temp is not None:
+        temp = _read_temperature()
+        if temp is not None and abs(temp - cal_temp) > config.ACCEL_CAL_MAX_TEMP_DELTA_C:
+            _log(f"보정 시점과 온도 차 과다: {cal_temp:.1f} -> {temp:.1f} °C"); return False
+    _set_offset_mg(ox, oy, oz)
+    _cal_boots = boots; _cal_temp_c = cal_temp
+    # 부팅 횟수만 바뀐 경우에는 저장하지 않음 (매 부팅 플래시 기록 방지) - 다음 보정값 갱신 저장 때 함께 기록
+    _log(f"저장된 보정값 사용 (부팅 {boots}회째): {offset_mg()}")
+    return True
+
+def _save_calibration():
+    """현재 보정값을 플래시에 저장"""
+    global _last_cal_save_ticks
+    _last_cal_save_ticks = utime.ticks_ms()
+    cal = offset_mg(); cal['boots'] = _cal_boots; cal['temp'] = _cal_temp_c
+    try:
+        with open(config.ACCEL_CAL_FILE, "w") as f: json.dump(cal, f)
+        return True
+    except OSError as e: _log(f"보정값 저장 실패: {e}"); return False
+
+def recalibrate():
+    """강제 재보정: 오프셋을 새로 계산하고 필터 초기화 후 플래시에 저장 (장치가 정지 상태여야 함)"""
+    global _cal_boots, _cal_temp_c
+    if not _calculate_accel_offsets(): return False
+    _cal_boots = 0; _cal_temp_c = _read_temperature()
+    _save_calibration()
+    return _init_filters()
+
+def _calculate_accel_offsets():
+    """가속도계 오프셋 계산 (약 1초 블로킹)"""
     _log("가속도 오프셋 계산 시작..."); sum_ax, sum_ay, sum_az = 0, 0, 0
     try:
         for i in range(config.OFFSET_SAMPLE_COUNT):
@@ -52,40 +210,82 @@ def _calculate_accel_offsets_and_init_filters():
             if i > 4 : sum_ax += ax; sum_ay += ay; sum_az += az
             utime.sleep_ms(20)
         num_samples = max(1, config.OFFSET_SAMPLE_COUNT - 5)
-        accel_offset['x'] = (sum_ax / num_samples) * config.ACCEL_SENSITIVITY
-        accel_offset['y'] = (sum_ay / num_samples) * config.ACCEL_SENSITIVITY
-        accel_offset['z'] = (sum_az / num_samples) * config.ACCEL_SENSITIVITY
-        _log(f"가속도 오프셋 계산 완료: {accel_offset}")
-        ax_raw, ay_raw, az_raw = _read_accel_raw()
-        current_ax = ax_raw * config.ACCEL_SENSITIVITY - accel_offset['x']
-        current_ay = ay_raw * config.ACCEL_SENSITIVITY - accel_offset['y']
-        current_az = az_raw * config.ACCEL_SENSITIVITY - accel_offset['z']
-        gravity_estimate['x'] = current_ax; gravity_estimate['y'] = current_ay; gravity_estimate['z'] = current_az
-        dynamic_accel['x'] = 0.0; dynamic_accel['y'] = 0.0; dynamic_accel['z'] = 0.0
+        _offset_q[0] = (sum_ax << _Q_SHIFT) // num_samples
+        _offset_q[1] = (sum_ay << _Q_SHIFT) // num_samples
+        _offset_q[2] = (sum_az << _Q_SHIFT) // num_samples
+        _log(f"가속도 오프셋 계산 완료: {offset_mg()}"); return True
+    except Exception as e: _log(f"오프셋 계산 중 오류: {e}"); return False
+
+def _init_filters():
+    """현재 오프셋 기준으로 중력 추정 필터 초기화"""
+    global _refine_count
+    try:
+        _read_accel_raw()
+        for i in range(3):
+            _gravity_q[i] = (accel_raw[i] << _Q_SHIFT) - _offset_q[i]
+            _dynamic_q[i] = 0
+        _refine_count = 0; _refine_sum[0] = _refine_sum[1] = _refine_sum[2] = 0
         _log("초기 필터 값 설정 완료"); return True
-    except Exception as e: _log(f"오프셋/필터 초기화 중 오류: {e}"); return False
-
-def _update_dynamic_accel():
-    """가속도 값 읽고 중력 제거하여 동적 가속도 계산"""
-    global gravity_estimate, dynamic_accel
-    ax_raw, ay_raw, az_raw = _read_accel_raw()
-    current_ax = ax_raw * config.ACCEL_SENSITIVITY - accel_offset['x']
-    current_ay = ay_raw * config.ACCEL_SENSITIVITY - accel_offset['y']
-    current_az = az_raw * config.ACCEL_SENSITIVITY - accel_offset['z']
-    gravity_estimate['x'] = config.GRAVITY_FILTER_ALPHA * current_ax + (1 - config.GRAVITY_FILTER_ALPHA) * gravity_estimate['x']
-    gravity_estimate['y'] = config.GRAVITY_FILTER_ALPHA * current_ay + (1 - config.GRAVITY_FILTER_ALPHA) * gravity_estimate['y']
-    gravity_estimate['z'] = config.GRAVITY_FILTER_ALPHA * current_az + (1 - config.GRAVITY_FILTER_ALPHA) * gravity_estimate['z']
-    dynamic_accel['x'] = current_ax - gravity_estimate['x']
-    dynamic_accel['y'] = current_ay - gravity_estimate['y']
-    dynamic_accel['z'] = current_az - gravity_estimate['z']
+    except Exception as e: _log(f"필터 초기화 중 오류: {e}"); return False
+
+def _filter_axis(i, raw):
+    """1축 중력 추정(EMA) 갱신 후 동적 가속도 계산 (정수 연산)"""
+    current = (raw << _Q_SHIFT) - _offset_q[i]
+    gravity = _gravity_q[i]
+    gravity += (_alpha_q8 * (current - gravity)) >> 8
+    _gravity_q[i] = gravity
+    _dynamic_q[i] = current - gravity
+
+def _update_dynamic_accel(ax_raw, ay_raw, az_raw):
+    """원시 가속도에서 중력 제거하여 동적 가속도 계산"""
+    _filter_axis(0, ax_raw); _filter_axis(1, ay_raw); _filter_axis(2, az_raw)
+
+def _refine_offsets(ax_raw, ay_raw, az_raw, is_still):
+    """정지 구간의 원시값을 누적해 오프셋을 점진적으로 갱신 (백그라운드 보정)"""
+    global _refine_count
+    if not is_still:
+        _refine_count = 0; _refine_sum[0] = _refine_sum[1] = _refine_sum[2] = 0; return
+    _refine_sum[0] += ax_raw; _refine_sum[1] += ay_raw; _refine_sum[2] += az_raw
+    _refine_count += 1
+    if _refine_count < config.ACCEL_CAL_REFINE_SAMPLES: return
+    changed = False
+    for i in range(3):
+        mean_q = (_refine_sum[i] << _Q_SHIFT) // _refine_count
+        delta = (_refine_alpha_q8 * (mean_q - _offset_q[i])) >> 8
+        _offset_q[i] += delta
+        _gravity_q[i] -= delta # 오프셋 변경으로 동적 가속도가 튀지 않도록 보상
+        _refine_sum[i] = 0
+        if delta: changed = True
+    _refine_count = 0
+    if changed and utime.ticks_diff(utime.ticks_ms(), _last_cal_save_ticks) >= config.ACCEL_CAL_SAVE_INTERVAL_MS:
+        if _save_calibration(): _log(f"정지 구간 보정값 갱신 저장: {offset_mg()}")
 
 def check_for_movement():
-    """3축 동적 가속도 크기가 임계값을 넘는지 확인하여 움직임 감지"""
+    """가속도를 읽고 3축 동적 가속도 크기가 임계값을 넘는지 확인하여 움직임 감지"""
     if not is_initialized: _log("센서 미초기화"); return False
-    _update_dynamic_accel()
-    dynamic_accel_magnitude_sq = dynamic_accel['x']**2 + dynamic_accel['y']**2 + dynamic_accel['z']**2
-    is_moving = dynamic_accel_magnitude_sq > (config.MOTION_THRESHOLD_MG ** 2)
+    _read_accel_raw()
+    return process_accel_sample(accel_raw[0], accel_raw[1], accel_raw[2])
+
+def process_accel_sample(ax_raw, ay_raw, az_raw):
+    """이미 읽은 원시 가속도 샘플로 움직임 판정 (정수 연산만 사용, 코어1 수집 샘플 처리용)"""
+    if _hw_hpf:
+        # 칩의 HPF 출력이 곧 동적 가속도
+        _dynamic_q[0] = ax_raw << _Q_SHIFT; _dynamic_q[1] = ay_raw << _Q_SHIFT; _dynamic_q[2] = az_raw << _Q_SHIFT
+        if utime.ticks_diff(_hpf_settle_until, utime.ticks_ms()) > 0: return False # HPF 안정화 중
+    else: _update_dynamic_accel(ax_raw, ay_raw, az_raw)
+    dx = _dynamic_q[0] >> _Q_SHIFT; dy = _dynamic_q[1] >> _Q_SHIFT; dz = _dynamic_q[2] >> _Q_SHIFT
+    limit = _motion_threshold_raw
+    # 한 축이라도 임계값을 넘으면 제곱 합 생략 (큰 값의 제곱이 small int 범위를 넘어 할당되지 않도록)
+    if abs(dx) > limit or abs(dy) > limit or abs(dz) > limit: magnitude_sq = -1
+    else: magnitude_sq = dx * dx + dy * dy + dz * dz
+    if config.ACCEL_CAL_REFINE_ENABLED and not _hw_hpf: _refine_offsets(ax_raw, ay_raw, az_raw, 0 <= magnitude_sq < _still_threshold_sq)
+    is_moving = magnitude_sq < 0 or magnitude_sq > _motion_threshold_sq
     # if is_moving: # 디버깅용 상세 로그
-    #    magnitude = math.sqrt(dynamic_accel_magnitude_sq)
+    #    magnitude = dynamic_magnitude_mg()
     #    _log(f"움직임 감지: Mag={magnitude:.1f} mg (Thr={config.MOTION_THRESHOLD_MG})")
-    return is_moving
\ No newline at end of file
+    return is_moving
+
+def dynamic_magnitude_mg():
+    """마지막 검사 시점의 동적 가속도 크기 (mg)"""
+    dx = _dynamic_q[0]; dy = _dynamic_q[1]; dz = _dynamic_q[2]
+    return math.sqrt(dx * dx + dy * dy + dz * dz) * config.ACCEL_SENSITIVITY / (1 << _Q_SHIFT)
\ No newline at end of file
@@ -3,24 +3,43 @@ import utime
 import math # 고도 계산용 pow
 import config
 # bmp280 라이브러리 및 필요한 상수 임포트
-from bmp280 import BMP280, BMP280_OS_STANDARD, BMP280_IIR_FILTER_4
+from bmp280 import BMP280, BMP280_OS_STANDARD, BMP280_IIR_FILTER_4, BMP280_TEMP_OS_SKIP, _BMP280_OS_MATRIX
 
 # 모듈 전역 변수
 _i2c = None
 _log_func = None
+_defer_log_func = None # 지연 기록 로그 콜백 (template, a, b, c) - 측정 루프의 문자열 할당 방지
 _bmp_sensor = None # 실제 BMP280 라이브러리 객체
 is_initialized = False
+# 적응형 측정 프로파일 상태
+_oss = config.BMP280_OSS_DEFAULT # 현재 압력 오버샘플링 단계 (_BMP280_OS_MATRIX 인덱스)
+_measure_oss = config.BMP280_OSS_DEFAULT # 진행 중인 변환의 오버샘플링 단계
+_measure_temp = True # 진행 중인 변환에 온도 측정 포함 여부
+_t_fine = None # 마지막 온도 변환의 t_fine (온도 생략 시 재사용)
+_t_fine_ticks = 0
+_last_temp_c = None
+_temp_interval = 1 # 온도 변환 간격 (측정 N회마다 1회)
+_temp_skip_left = 0
 
 def _log(message):
     if _log_func: _log_func(f"[PressureSensor] {message}")
     else: print(f"[PressureSensor] {message}")
 
-def init(i2c_bus, log_callback=None):
+def _log_deferred(template, a=None, b=None, c=None):
+    """측정 루프용 로그: 지연 기록 콜백이 있으면 서식화 없이 전달 (template 은 "[PressureSensor] " 접두어 포함)"""
+    if _defer_log_func: _defer_log_func(template, a, b, c); return
+    message = template.format(a, b, c) # 접두어가 이미 있으므로 _log 를 거치지 않음
+    if _log_func: _log_func(message)
+    else: print(message)
+
+def init(i2c_bus, log_callback=None, defer_log_callback=None):
     """BMP280 센서 초기화, FLOOR 케이스 설정 적용 및 Sleep 모드 설정"""
-    global _i2c, _log_func, _bmp_sensor, is_initialized
+    global _i2c, _log_func, _defer_log_func, _bmp_sensor, is_initialized, _oss, _t_fine, _last_temp_c, _temp_interval
     _i2c = i2c_bus
     _log_func = log_callback
+    _defer_log_func = defer_log_callback
     is_initialized = False
+    _oss = config.BMP280_OSS_DEFAULT; _t_fine = None; _last_temp_c = None; _temp_interval = 1
     try:
         # --- 실제 BMP280 라이브러리 객체 생성 (use_case=None 으로 기본 설정 방지) ---
         _bmp_sensor = BMP280(i2c_bus, addr=config.BMP280_ADDR, use_case=None)
@@ -31,6 +50,7 @@ def init(i2c_bus, log_callback=None):
         _bmp_sensor.oversample(BMP280_OS_STANDARD) # Standard 오버샘플링 설정 (Press=x4, Temp=x1)
         _bmp_sensor.iir = BMP280_IIR_FILTER_4      # IIR 필터 4 설정
         _log(f"BMP280 설정: Oversampling=Standard(x4/x1), IIR Filter=4")
+        # 이후 측정은 start_measurement()가 현재 프로파일(_oss, 온도 생략 여부)로 Forced 변환마다 설정
         # -------------------------------------------
 
         # 초기 상태를 Sleep 모드로 설정
@@ -42,13 +62,60 @@ def init(i2c_bus, log_callback=None):
         _log(f"BMP280 초기화 중 오류: {e}")
         return False
 
+def _conversion_time_ms(p_os, t_os):
+    """Forced 변환 최대 소요 시간 (ms, 데이터시트 부록 B 기준) - 온도 생략 시 짧아짐"""
+    t_count = (1 << (t_os - 1)) if t_os else 0
+    p_count = (1 << (p_os - 1)) if p_os else 0
+    return int(1.25 + 2.3 * t_count + 2.3 * p_count + 0.575 + 0.999) # 올림
+
+def set_oversampling(oss):
+    """다음 측정부터 사용할 오버샘플링 단계 (BMP280_OS_ULTRALOW ~ BMP280_OS_ULTRAHIGH)"""
+    global _oss
+    _oss = oss
+
+def _temperature_due():
+    """이번 변환에 온도 측정이 필요한지 (온도가 안정적이면 N회마다 1회로 줄임)"""
+    if not config.BMP280_TEMP_SKIP_ENABLED or _t_fine is None or _temp_skip_left <= 0: return True
+    return utime.ticks_diff(utime.ticks_ms(), _t_fine_ticks) >= config.BMP280_TEMP_MAX_AGE_MS
+
+def start_measurement():
+    """Forced 측정 1회 시작 (비블로킹), 결과를 읽을 수 있을 때까지의 대기 시간(ms) 반환"""
+    global _measure_temp, _measure_oss
+    _measure_oss = _oss # 변환 도중 set_oversampling 이 호출되어도 이 변환의 설정을 기록
+    p_os, t_os, _ = _BMP280_OS_MATRIX[_measure_oss]
+    _measure_temp = _temperature_due()
+    if not _measure_temp: t_os = BMP280_TEMP_OS_SKIP # 캐시된 t_fine 으로 보상
+    _bmp_sensor.force_measure_os(p_os, t_os) # 오버샘플링 + Forced 모드를 한 번에 기록
+    return _conversion_time_ms(p_os, t_os)
+
+def measurement_oss():
+    """마지막으로 시작한 변환의 오버샘플링 단계 (코어1 수집 샘플에 함께 기록)"""
+    return _measure_oss
+
+def read_measurement():
+    """start_measurement 이후 온도 보상된 압력(Pa) 반환 - 로그 없이 예외를 그대로 전달 (코어1 수집용)"""
+    global _t_fine, _t_fine_ticks, _last_temp_c, _temp_interval, _temp_skip_left
+    if not _measure_temp:
+        _temp_skip_left -= 1
+        return _bmp_sensor.pressure_with_t_fine(_t_fine)
+    pressure = _bmp_sensor.pressure
+    _t_fine = _bmp_sensor.t_fine; _t_fine_ticks = utime.ticks_ms()
+    temp_c = ((_t_fine * 5 + 128) >> 8) / 100.0
+    # 직전 온도와 차이가 작으면 온도 변환 간격을 두 배로 (최대 BMP280_TEMP_MAX_INTERVAL), 아니면 매번 측정
+    if _last_temp_c is not None and abs(temp_c - _last_temp_c) <= config.BMP280_TEMP_STABLE_DELTA_C:
+        _temp_interval = min(_temp_interval * 2, config.BMP280_TEMP_MAX_INTERVAL)
+    else: _temp_interval = 1
+    _temp_skip_left = _temp_interval - 1
+    _last_temp_c = temp_c
+    return pressure
+
 def get_pressure_reading(num_samples=config.PRESSURE_AVG_SAMPLES):
     """Forced 모드로 전환, 설정된 오버샘플링/필터로 여러 번 측정 후 평균 압력 반환 (Pa), 끝나고 Sleep"""
     if not is_initialized or _bmp_sensor is None:
         _log("BMP280이 초기화되지 않았습니다.")
         return None
 
-    readings = []
+    total = 0.0; count = 0 # 리스트 대신 합계/개수로 평균 (측정마다 리스트 할당 방지)
     # --- 측정 전 현재 파워 모드 확인 (선택적 디버깅) ---
     # try:
     #     current_power = _bmp_sensor.power_mode
@@ -59,21 +126,19 @@ def get_pressure_reading(num_samples=config.PRESSURE_AVG_SAMPLES):
     # ----------------------------------------------
 
     try:
-        # --- 측정 대기 시간 결정 ---
-        # oversample() 메소드가 read_wait_ms를 설정하므로 이를 사용
-        wait_time = _bmp_sensor.read_wait_ms if hasattr(_bmp_sensor, 'read_wait_ms') and _bmp_sensor.read_wait_ms > 0 else 20 # 안전 기본값
-        _log(f"측정 대기 시간: {wait_time} ms (Standard Oversampling 기준)")
+        # --- 측정 프로파일 (오버샘플링 단계, 온도 변환 생략 여부에 따라 대기 시간 결정) ---
+        _log_deferred("[PressureSensor] 측정 프로파일: OSS={0}, 온도 변환 간격={1}회", _oss, _temp_interval)
         # ---------------------------
 
         for i in range(num_samples):
-            _bmp_sensor.force_measure() # Forced 모드 시작 (power_mode 속성 사용)
-            utime.sleep_ms(wait_time)   # 계산된/설정된 대기 시간 사용
+            wait_time = start_measurement() # Forced 모드 시작, 현재 프로파일의 변환 시간 반환
+            utime.sleep_ms(wait_time)
 
             # --- 온도 보상된 압력 값 읽기 (속성 접근) ---
-            pressure = _bmp_sensor.pressure
+            pressure = read_measurement()
 
             if pressure is not None:
-                 readings.append(pressure)
+                 total += pressure; count += 1
                  # 디버깅 로그 추가 가능
                  # _log(f" 샘플 {i+1}: {pressure:.2f} Pa")
             else:
@@ -83,15 +148,15 @@ def get_pressure_reading(num_samples=config.PRESSURE_AVG_SAMPLES):
             if i < num_samples - 1:
                  utime.sleep_ms(50) # 예: 50ms
 
-        if not readings:
+        if count == 0:
             _log("유효한 압력 값을 읽지 못했습니다.")
             # 최종적으로 Sleep 모드 전환 시도
             _bmp_sensor.sleep() # 메소드 호출로 수정
             return None
 
         # 평균값 계산
-        avg_pressure = sum(readings) / len(readings)
-        _log(f"평균 압력 측정: {avg_pressure:.2f} Pa ({len(readings)}/{num_samples} 샘플)")
+        avg_pressure = total / count
+        _log_deferred("[PressureSensor] 평균 압력 측정: {0:.2f} Pa ({1}/{2} 샘플)", avg_pressure, count, num_samples)
         # 최종적으로 Sleep 모드 전환
         _bmp_sensor.sleep() # 메소드 호출로 수정
         return avg_pressure
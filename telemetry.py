@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import machine
+import utime
+import config
+import telemetry_protocol as proto
+
+# 모듈 전역 변수
+_uart = None
+_log_func = None
+is_initialized = False
+# 미리 할당된 송신 큐 (링 버퍼) - 메인 루프에서 메모리 할당 없이 프레임 적재
+_slots = [bytearray(proto.MAX_FRAME_SIZE) for _ in range(config.TELEMETRY_QUEUE_SLOTS)]
+_slot_len = [0] * config.TELEMETRY_QUEUE_SLOTS
+_head = 0 # 다음 기록 위치
+_tail = 0 # 다음 전송 위치
+_count = 0
+_seq = 0
+_tx_backlog = 0 # UART 송신 버퍼에 남아 있을 수 있는 바이트 수 (추정)
+dropped_frames = 0
+sent_frames = 0
+
+def _log(message):
+    if _log_func: _log_func(f"[Telemetry] {message}")
+    else: print(f"[Telemetry] {message}")
+
+def init(log_callback=None):
+    """텔레메트리 UART 초기화"""
+    global _uart, _log_func, is_initialized, _head, _tail, _count, _tx_backlog
+    _log_func = log_callback; is_initialized = False
+    _head = _tail = _count = _tx_backlog = 0
+    try:
+        _uart = machine.UART(config.TELEMETRY_UART_ID, baudrate=config.TELEMETRY_BAUDRATE,
+                             tx=machine.Pin(config.PIN_TELEMETRY_TX), rx=machine.Pin(config.PIN_TELEMETRY_RX),
+                             txbuf=config.TELEMETRY_TXBUF)
+        _log(f"UART{config.TELEMETRY_UART_ID} 초기화 완료 ({config.TELEMETRY_BAUDRATE} baud)")
+        is_initialized = True; return True
+    except Exception as e: _log(f"UART 초기화 중 오류: {e}"); return False
+
+def _enqueue(msg_type, *values):
+    """프레임을 큐에 적재 (가득 차면 새 프레임 폐기)"""
+    global _head, _count, _seq, dropped_frames
+    if not is_initialized: return False
+    if _count >= config.TELEMETRY_QUEUE_SLOTS:
+        dropped_frames += 1; return False
+    try: _slot_len[_head] = proto.pack_frame_into(_slots[_head], msg_type, _seq, utime.ticks_ms(), *values)
+    except Exception: dropped_frames += 1; return False # 범위를 벗어난 값 등
+    _seq = (_seq + 1) & 0xFF
+    _head = (_head + 1) % config.TELEMETRY_QUEUE_SLOTS; _count += 1
+    return True
+
+def send_state(old_state, new_state): return _enqueue(proto.MSG_STATE, old_state, new_state)
+def send_pressure(pressure_pa, altitude_m): return _enqueue(proto.MSG_PRESSURE, pressure_pa, altitude_m)
+def send_accel(magnitude_mg): return _enqueue(proto.MSG_ACCEL, magnitude_mg)
+def send_battery(voltage_mv): return _enqueue(proto.MSG_BATTERY, voltage_mv)
+
+def poll():
+    """큐의 프레임을 UART 송신 버퍼 여유만큼만 기록 (메인 루프가 블로킹되지 않음)"""
+    global _tail, _count, _tx_backlog, sent_frames
+    if not is_initialized or _count == 0: return
+    if _uart.txdone(): _tx_backlog = 0
+    for _ in range(config.TELEMETRY_MAX_FRAMES_PER_POLL):
+        if _count == 0: break
+        frame_len = _slot_len[_tail]
+        if _tx_backlog + frame_len > config.TELEMETRY_TXBUF: break # 버퍼 여유 없음 -> 다음 루프에서 전송
+        _uart.write(memoryview(_slots[_tail])[:frame_len])
+        _tx_backlog += frame_len; sent_frames += 1
+        _tail = (_tail + 1) % config.TELEMETRY_QUEUE_SLOTS; _count -= 1
+
+def is_idle():
+    """전송 대기 프레임이 없고 UART 송신이 끝났는지 (lightsleep 진입 가능 여부)"""
+    return not is_initialized or (_count == 0 and _uart.txdone())
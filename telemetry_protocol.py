@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# 텔레메트리 프레임 형식 정의 (보드의 telemetry.py 와 호스트 수집기가 공유)
+#
+# 프레임: SYNC(2) | TYPE(1) | SEQ(1) | LEN(1) | PAYLOAD(LEN) | CRC16(2, LE)
+#   CRC16-CCITT (다항식 0x1021, 초기값 0xFFFF), TYPE~PAYLOAD 범위
+#   모든 페이로드는 리틀엔디안, 첫 필드는 보드 ticks_ms
+import struct
+
+SYNC = b'\xA5\x5A'
+HEADER_SIZE = 5 # SYNC + TYPE + SEQ + LEN
+CRC_SIZE = 2
+FRAME_OVERHEAD = HEADER_SIZE + CRC_SIZE
+
+MSG_STATE = 1     # 상태 전이 (이전 상태, 새 상태)
+MSG_PRESSURE = 2  # 기압(Pa), 고도(m)
+MSG_ACCEL = 3     # 동적 가속도 크기(mg)
+MSG_BATTERY = 4   # 배터리 전압(mV)
+
+PAYLOAD_FORMATS = {
+    MSG_STATE: '<IBB',
+    MSG_PRESSURE: '<Iff',
+    MSG_ACCEL: '<If',
+    MSG_BATTERY: '<IH',
+}
+MSG_NAMES = {MSG_STATE: 'state', MSG_PRESSURE: 'pressure', MSG_ACCEL: 'accel', MSG_BATTERY: 'battery'}
+FIELD_NAMES = {
+    MSG_STATE: ('ticks_ms', 'old_state', 'new_state'),
+    MSG_PRESSURE: ('ticks_ms', 'pressure_pa', 'altitude_m'),
+    MSG_ACCEL: ('ticks_ms', 'magnitude_mg'),
+    MSG_BATTERY: ('ticks_ms', 'millivolts'),
+}
+PAYLOAD_SIZES = {t: struct.calcsize(f) for t, f in PAYLOAD_FORMATS.items()}
+MAX_FRAME_SIZE = FRAME_OVERHEAD + max(PAYLOAD_SIZES.values())
+
+def _make_crc_table():
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+_CRC_TABLE = _make_crc_table()
+
+def crc16(buf, start=0, end=None, crc=0xFFFF):
+    """CRC16-CCITT (테이블 방식)"""
+    if end is None: end = len(buf)
+    for i in range(start, end):
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ buf[i]) & 0xFF]
+    return crc
+
+def pack_frame_into(buf, msg_type, seq, *values):
+    """미리 할당된 버퍼에 프레임을 기록하고 프레임 길이 반환"""
+    payload_len = PAYLOAD_SIZES[msg_type]
+    buf[0] = SYNC[0]; buf[1] = SYNC[1]
+    buf[2] = msg_type; buf[3] = seq & 0xFF; buf[4] = payload_len
+    struct.pack_into(PAYLOAD_FORMATS[msg_type], buf, HEADER_SIZE, *values)
+    end = HEADER_SIZE + payload_len
+    struct.pack_into('<H', buf, end, crc16(buf, 2, end))
+    return end + CRC_SIZE
+
+def frames_per_second(baudrate, msg_type, bits_per_byte=10):
+    """주어진 보레이트에서 최대 전송 가능 메시지 수/초 (8N1 = 바이트당 10비트)"""
+    return baudrate / bits_per_byte / (FRAME_OVERHEAD + PAYLOAD_SIZES[msg_type])
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""펌웨어 모듈을 .mpy로 사전 컴파일하거나 동결(frozen)용 매니페스트를 생성하는 호스트 빌드 스크립트
+
+사용 예:
+    python tools/build_mpy.py                 # build/ 에 .mpy + main.py 생성
+    python tools/build_mpy.py --manifest      # build/manifest.py 도 함께 생성
+    python tools/build_mpy.py --with-benchmark  # 보드에서 벤치마크를 돌릴 때만 benchmark.py 포함
+
+.mpy 파일은 보드에서 파싱/컴파일 단계를 건너뛰므로 임포트 시간이 줄어듦.
+main.py 는 부팅 진입점이므로 소스 그대로 복사함.
+동결 모듈은 MicroPython 펌웨어 빌드 시 FROZEN_MANIFEST=build/manifest.py 로 지정.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_MODULE = "main.py"
+# 운영 빌드에서 제외하는 모듈 (보드 플래시/부팅에 불필요)
+BENCHMARK_MODULE = "benchmark.py"
+# RP2040 (Cortex-M0+)
+DEFAULT_MARCH = "armv6m"
+
+
+def find_device_modules(with_benchmark=False):
+    """보드에 올라가는 모듈 목록 (저장소 최상위 .py, 진입점 제외, 벤치마크는 요청 시에만)"""
+    return sorted(
+        name for name in os.listdir(ROOT_DIR)
+        if name.endswith(".py") and name != ENTRY_MODULE
+        and (with_benchmark or name != BENCHMARK_MODULE)
+    )
+
+
+def compile_modules(mpy_cross, modules, out_dir, march):
+    for name in modules:
+        src = os.path.join(ROOT_DIR, name)
+        dst = os.path.join(out_dir, name[:-3] + ".mpy")
+        cmd = [mpy_cross, "-march=" + march, "-O1", "-o", dst, src]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            sys.stderr.write(f"{name} 컴파일 실패:\n{result.stderr}")
+            return False
+        print(f"  {name} -> {os.path.relpath(dst, ROOT_DIR)}")
+    return True
+
+
+def write_manifest(modules, out_dir):
+    path = os.path.join(out_dir, "manifest.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# tools/build_mpy.py 가 생성한 파일 - 직접 수정하지 말 것\n")
+        f.write('include("$(PORT_DIR)/boards/manifest.py")\n')
+        for name in modules:
+            f.write(f'module("{name}", base_path="{ROOT_DIR}")\n')
+    print(f"  매니페스트 생성: {os.path.relpath(path, ROOT_DIR)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="펌웨어 모듈 사전 컴파일 (.mpy / frozen)")
+    parser.add_argument("--mpy-cross", default=shutil.which("mpy-cross"), help="mpy-cross 실행 파일 경로")
+    parser.add_argument("--march", default=DEFAULT_MARCH, help="대상 아키텍처 (기본: armv6m)")
+    parser.add_argument("--out", default=os.path.join(ROOT_DIR, "build"), help="출력 디렉터리")
+    parser.add_argument("--manifest", action="store_true", help="동결 모듈용 manifest.py 생성")
+    parser.add_argument("--with-benchmark", action="store_true", help="benchmark.py 포함 (보드 벤치마크용 빌드)")
+    args = parser.parse_args(argv)
+
+    modules = find_device_modules(args.with_benchmark)
+    os.makedirs(args.out, exist_ok=True)
+
+    if args.manifest:
+        write_manifest(modules, args.out)
+    if args.mpy_cross is None:
+        sys.stderr.write("mpy-cross 를 찾을 수 없습니다. (pip install mpy-cross 또는 --mpy-cross 지정)\n")
+        return 1
+    print(f"{len(modules)}개 모듈 컴파일 ({args.march})")
+    if not compile_modules(args.mpy_cross, modules, args.out, args.march):
+        return 1
+    shutil.copy(os.path.join(ROOT_DIR, ENTRY_MODULE), os.path.join(args.out, ENTRY_MODULE))
+    print(f"  {ENTRY_MODULE} 복사")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
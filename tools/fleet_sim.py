@@ -0,0 +1,618 @@
+# -*- coding: utf-8 -*-
+"""가상 장치 플릿 시뮬레이터 (호스트용)
+
+장치마다 실제 main.main() 을 host/ 의 가상 하드웨어(machine, utime 가상 시계, 가상 센서)에서 독립적으로 실행함.
+장치별 설정 덮어쓰기와 센서 시나리오(야간 유휴, 인양 작업, 바람, 센서 고장, 저전압)를 적용하고,
+여러 프로세스에 나눠 실행한 결과를 플릿 리포트(알람 수, 미검출 인양, 배터리 소모, 오류)로 집계함.
+임계값 등 설정 변경을 배포하기 전에 --variant 로 같은 시나리오(같은 시드)의 기준/변경 결과를 비교할 수 있음.
+
+사용 예:
+    python tools/fleet_sim.py --devices 500 --hours 24
+    python tools/fleet_sim.py --devices 200 --variant ALTITUDE_CHANGE_THRESHOLD=1.5 --json fleet.json
+    python tools/fleet_sim.py --devices 50 --mix hoisting=1 --set TREND_ENABLED=True --logs-dir sim_logs/
+    python tools/log_analyzer.py sim_logs/    # 저장한 장치 로그는 로그 분석기로 그대로 분석 가능
+
+가속: 모니터링 중 다음 측정까지의 대기(바쁜 대기) 루프는 측정 예정 시각 직전까지 시계를 한 번에 진행함.
+      IDLE 상태의 lightsleep 중에 시나리오상 다음 활동(인양, 접촉, 바람, 고장)까지 입력 변화가 없으면
+      가상 시계를 최대 --idle-warp-s 만큼 건너뜀. 건너뛴 루프의 깨어 있는 시간은 배터리 모델에 반영함.
+      --exact 이면 두 가속을 모두 끄고 모든 루프를 그대로 실행함 (정확하지만 느림).
+주의: 코어1 수집(ACQ_ENABLED)은 스레드가 가상 시계를 공유할 수 없으므로 지원하지 않음.
+      import 시 계산되는 파생 설정값(예: PRESSURE_MONITOR_TIMEOUT_MS)은 원본 값을 바꿔도 따라 바뀌지 않으므로 함께 지정해야 함.
+"""
+import argparse
+import ast
+import contextlib
+import errno
+import json
+import math
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import unicodedata
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+_TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+_ROOT_DIR = os.path.dirname(_TOOLS_DIR)
+_HOST_DIR = os.path.join(_ROOT_DIR, 'host')
+sys.path.insert(0, _TOOLS_DIR)
+sys.path.insert(0, _ROOT_DIR)
+sys.path.insert(0, _HOST_DIR)
+import log_analyzer  # noqa: E402
+
+# 장치마다 새로 import 할 모듈 (펌웨어 + 가상 하드웨어, 모듈 전역 상태를 장치 간에 공유하지 않도록)
+_DEVICE_MODULES = frozenset(
+    name[:-3] for directory in (_ROOT_DIR, _HOST_DIR) for name in os.listdir(directory) if name.endswith('.py'))
+
+DAY_S = 86400
+WORK_START_S = 7 * 3600 # 작업 시간 (인양, 접촉, 센서 고장 발생 구간)
+WORK_END_S = 18 * 3600
+LIFT_ALARM_MIN_M = 2.0 # 이 높이 이상 인양은 알람이 울려야 함 (미검출 판정 기준, 펌웨어 임계값과 무관)
+LIFT_ALARM_GRACE_S = 10.0 # 상승 완료 후 이 시간 안의 알람까지 해당 인양의 알람으로 인정
+ACTIVITY_MARGIN_S = 2.0 # 활동 구간 앞뒤 여유 (이 구간에서는 시계를 건너뛰지 않음)
+
+# 배터리 모델: 상태별 평균 소비 전류 (mA), 개방 전압 곡선 (잔량 비율, V), 내부 저항 (ohm)
+CURRENT_SLEEP_MA = 1.6 # lightsleep (RP2040 + 센서 저전력 모드)
+CURRENT_ACTIVE_MA = 28.0 # 깨어 있는 시간 (측정, 로그 기록)
+CURRENT_AUDIO_MA = 180.0 # I2S 재생 (앰프 포함)
+BATTERY_OCV = ((0.0, 3.0), (0.05, 3.45), (0.10, 3.60), (0.20, 3.70), (0.50, 3.80), (0.80, 3.95), (1.0, 4.15))
+BATTERY_RESISTANCE_OHM = 0.15
+DEFAULT_WAKE_US = 2000 # IDLE 루프 1회의 깨어 있는 시간 초기 추정값 (실행 중 측정값으로 갱신)
+WAIT_GUARD_US = 5000 # 모니터링 대기 건너뛰기: 다음 측정 예정 시각 이 시간 전까지만 진행
+
+SCENARIOS = ('idle', 'hoisting', 'windy', 'sensor_fault', 'low_battery')
+DEFAULT_MIX = 'idle=0.2,hoisting=0.5,windy=0.15,sensor_fault=0.1,low_battery=0.05'
+
+
+class Scenario:
+    """장치 1대의 센서 입력 타임라인 (시드로 재현 가능, 시간 단위 s)
+
+    lifts: (상승 시작, 상승 끝, 하강 시작, 하강 끝, 높이 m, 흔들림 mg)
+    bumps: (시작, 끝, 진폭 mg) - 인양 직전 훅 흔들림, 단순 접촉
+    winds: (시작, 끝, 세기 0~1)
+    faults: (시작, 끝, 'accel' | 'pressure')
+    """
+
+    def __init__(self, kind, seed, duration_s):
+        rng = random.Random(seed)
+        self.kind = kind
+        self.duration_s = duration_s
+        self.lifts = []; self.bumps = []; self.winds = []; self.faults = []
+        self.site_altitude = rng.uniform(0.0, 300.0)
+        self.soc = rng.uniform(0.05, 0.15) if kind == 'low_battery' else rng.uniform(0.6, 1.0)
+        tilt = rng.uniform(0.0, 0.2); heading = rng.uniform(0.0, 2 * math.pi)
+        self._gravity = (1000.0 * math.sin(tilt) * math.cos(heading), 1000.0 * math.sin(tilt) * math.sin(heading),
+                         1000.0 * math.cos(tilt))
+        self._weather_phase = rng.uniform(0.0, 2 * math.pi)
+        self._wind_phase = rng.uniform(0.0, 2 * math.pi)
+        for day in range(int(math.ceil(duration_s / DAY_S))):
+            base = day * DAY_S
+            if kind != 'idle': self._add_lifts(rng, base)
+            for _ in range(rng.randint(0, 6)): # 단순 접촉 (인양 없음)
+                start = base + rng.uniform(WORK_START_S, WORK_END_S)
+                if self._find([lift[0] for lift in self.lifts], self.lifts, start, 3) is None: self.bumps.append((start, start + rng.uniform(0.5, 2.0), rng.uniform(200.0, 600.0)))
+            if kind == 'windy': self._add_winds(rng, base)
+        if kind == 'sensor_fault':
+            which = rng.choice(('accel', 'pressure'))
+            if rng.random() < 0.25: self.faults.append((0.0, duration_s, which)) # 부팅 시부터 고장
+            else:
+                start = rng.uniform(WORK_START_S, WORK_END_S)
+                self.faults.append((start, start + rng.uniform(60.0, 3600.0), which))
+        self.bumps.sort()
+        self._lift_starts = [lift[0] for lift in self.lifts]
+        self._bump_starts = [bump[0] for bump in self.bumps]
+        self._wind_starts = [wind[0] for wind in self.winds]
+        self._build_activity()
+        self._noise = random.Random(seed ^ 0x5EED)
+
+    def _add_lifts(self, rng, base):
+        t = base + WORK_START_S + rng.uniform(0.0, 600.0)
+        while t < base + WORK_END_S:
+            height = rng.uniform(2.0, 30.0) if rng.random() < 0.8 else rng.uniform(0.3, 1.8) # 20%는 소폭 조정
+            speed = rng.uniform(0.15, 0.8)
+            rise_start = t + 2.0
+            rise_end = rise_start + height / speed
+            lower_start = rise_end + rng.uniform(20.0, 120.0) # 선회(slewing) 후 하강
+            lower_end = lower_start + height / speed
+            self.bumps.append((t, rise_start + 1.0, rng.uniform(200.0, 500.0))) # 줄걸이/인양 시작 흔들림
+            self.lifts.append((rise_start, rise_end, lower_start, lower_end, height, rng.uniform(30.0, 250.0)))
+            t = lower_end + rng.uniform(120.0, 900.0)
+
+    def _add_winds(self, rng, base):
+        end = base
+        for _ in range(rng.randint(1, 2)):
+            start = max(end, base + rng.uniform(0.0, DAY_S - 3600.0))
+            end = min(start + rng.uniform(3600.0, 5 * 3600.0), base + DAY_S)
+            if start < end: self.winds.append((start, end, rng.uniform(0.3, 1.0)))
+
+    def _build_activity(self):
+        """시계를 건너뛸 수 없는 구간 목록 (겹치는 구간 병합)"""
+        spans = [(l[0] - 3.0, l[3]) for l in self.lifts] + [(b[0], b[1]) for b in self.bumps]
+        spans += [(w[0], w[1]) for w in self.winds] + [(f[0], f[1]) for f in self.faults]
+        self._active_starts = []; self._active_ends = []
+        for start, end in sorted(spans):
+            start -= ACTIVITY_MARGIN_S; end += ACTIVITY_MARGIN_S
+            if self._active_ends and start <= self._active_ends[-1]:
+                self._active_ends[-1] = max(self._active_ends[-1], end)
+            else: self._active_starts.append(start); self._active_ends.append(end)
+
+    @staticmethod
+    def _find(starts, items, t, end_index=1):
+        i = bisect_right(starts, t) - 1
+        if i >= 0 and t < items[i][end_index]: return items[i]
+        return None
+
+    def next_activity(self, t):
+        """t 이후 첫 활동 시각 (활동 중이면 t, 없으면 inf)"""
+        i = bisect_right(self._active_starts, t) - 1
+        if i >= 0 and t < self._active_ends[i]: return t
+        return self._active_starts[i + 1] if i + 1 < len(self._active_starts) else math.inf
+
+    def hook_height(self, t):
+        lift = self._find(self._lift_starts, self.lifts, t, 3)
+        if lift is None: return 0.0
+        rise_start, rise_end, lower_start, lower_end, height, _ = lift
+        if t < rise_end: return height * (t - rise_start) / (rise_end - rise_start)
+        if t < lower_start: return height
+        return height * (lower_end - t) / (lower_end - lower_start)
+
+    def pressure(self, t):
+        """기압 (Pa): 현장 고도 + 훅 높이, 일교차 기압 변화, 바람 요동, 센서 잡음"""
+        altitude = self.site_altitude + self.hook_height(t)
+        p = 101325.0 * math.pow(1.0 - altitude / 44330.0, 5.255)
+        p += 150.0 * math.sin(2 * math.pi * t / DAY_S + self._weather_phase)
+        wind = self._find(self._wind_starts, self.winds, t)
+        if wind is not None:
+            p += wind[2] * 8.0 * (0.6 * math.sin(2 * math.pi * t / 7.3 + self._wind_phase) + 0.4 * math.sin(2 * math.pi * t / 2.1))
+        return p + self._noise.gauss(0.0, 1.5)
+
+    def accel(self, t):
+        """가속도 (mg, x/y/z): 중력 + 접촉/인양 흔들림 + 바람 진동 + 센서 잡음"""
+        gauss = self._noise.gauss
+        x, y, z = self._gravity
+        x += gauss(0.0, 3.0); y += gauss(0.0, 3.0); z += gauss(0.0, 3.0)
+        bump = self._find(self._bump_starts, self.bumps, t)
+        if bump is not None:
+            x += bump[2] * math.sin(2 * math.pi * 1.7 * t); z += 0.5 * bump[2] * math.cos(2 * math.pi * 1.7 * t)
+        lift = self._find(self._lift_starts, self.lifts, t, 3)
+        if lift is not None: y += lift[5] * math.sin(2 * math.pi * 0.4 * t)
+        wind = self._find(self._wind_starts, self.winds, t)
+        if wind is not None:
+            gust = 0.5 + 0.5 * math.sin(2 * math.pi * t / 11.0 + self._wind_phase)
+            x += wind[2] * 200.0 * gust * math.sin(2 * math.pi * 0.9 * t)
+        return x, y, z
+
+    def fault_active(self, which, t):
+        for start, end, kind in self.faults:
+            if kind == which and start <= t < end: return True
+        return False
+
+
+class Battery:
+    """상태별 소비 전류를 적분하는 배터리 모델 (ADC 가상 입력 제공)"""
+
+    def __init__(self, capacity_mah, soc, utime, config):
+        self.capacity_mah = capacity_mah
+        self.soc0 = soc
+        self.sleep_us = 0
+        self.audio_us = 0
+        self.dead_at_s = None
+        self._utime = utime
+        self._adc_scale = 65535 / (config.ADC_REF_VOLTAGE * config.VOLTAGE_DIVIDER_RATIO)
+        self._audio_start = None
+
+    def consumed_mah(self, now_us=None):
+        now_us = self._utime.peek_us() if now_us is None else now_us
+        audio_us = self.audio_us + (now_us - self._audio_start if self._audio_start is not None else 0)
+        active_us = max(0, now_us - self.sleep_us - audio_us)
+        return (self.sleep_us * CURRENT_SLEEP_MA + active_us * CURRENT_ACTIVE_MA + audio_us * CURRENT_AUDIO_MA) / 3.6e9
+
+    def soc(self, now_us=None):
+        return self.soc0 - self.consumed_mah(now_us) / self.capacity_mah
+
+    def voltage(self, now_us=None):
+        soc = max(0.0, self.soc(now_us))
+        for (s0, v0), (s1, v1) in zip(BATTERY_OCV, BATTERY_OCV[1:]):
+            if soc <= s1: ocv = v0 + (v1 - v0) * (soc - s0) / (s1 - s0); break
+        else: ocv = BATTERY_OCV[-1][1]
+        load_ma = CURRENT_AUDIO_MA if self._audio_start is not None else CURRENT_ACTIVE_MA
+        return ocv - load_ma / 1000.0 * BATTERY_RESISTANCE_OHM
+
+    def check_alive(self):
+        """잔량이 없으면 종료 시각을 기록하고 KeyboardInterrupt (장치 정지)"""
+        if self.dead_at_s is None and self.soc() <= 0:
+            self.dead_at_s = self._utime.peek_us() / 1e6
+            raise KeyboardInterrupt
+
+    def read_u16(self):
+        """machine.adc_source: VSYS 분압 입력 ADC 값"""
+        self.check_alive()
+        if self.dead_at_s is not None: return 0
+        return max(0, min(65535, int(self.voltage() * self._adc_scale)))
+
+    def audio(self, playing):
+        now = self._utime.peek_us()
+        if playing: self._audio_start = now
+        elif self._audio_start is not None: self.audio_us += now - self._audio_start; self._audio_start = None
+
+
+class _FaultyDevice:
+    """시나리오의 고장 구간에 모든 접근에서 OSError 를 발생시키는 가상 I2C 장치 래퍼"""
+
+    def __init__(self, device, scenario, which, utime):
+        self.device = device; self._scenario = scenario; self._which = which; self._utime = utime
+
+    def _check(self):
+        if self._scenario.fault_active(self._which, self._utime.peek_us() / 1e6): raise OSError(errno.EIO)
+
+    def read(self, reg, n):
+        self._check(); return self.device.read(reg, n)
+
+    def write(self, reg, data):
+        self._check(); return self.device.write(reg, data)
+
+
+def _fresh_modules():
+    """펌웨어/가상 하드웨어 모듈을 sys.modules 에서 제거 (다음 import 시 새 모듈 상태로 로드)"""
+    for name in list(sys.modules):
+        if name in _DEVICE_MODULES: del sys.modules[name]
+
+
+def write_alarm_wav(path, seconds, rate=8000):
+    """알람 재생 시간 모사용 무음 WAV (16비트 모노)"""
+    data_size = int(seconds * rate) * 2
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE')
+        f.write(b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, rate, rate * 2, 2, 16))
+        f.write(b'data' + struct.pack('<I', data_size) + bytes(data_size))
+
+
+def _evaluate_lifts(scenario, alarms, end_s):
+    """알람을 인양 구간과 대조: (인양 중 알람, 그 외 알람, 알람 필요 인양 수, 미검출 수, 검출 지연 목록)"""
+    lift_alarms = 0
+    for t in alarms:
+        for rise_start, _, _, lower_end, _, _ in scenario.lifts:
+            if rise_start - ACTIVITY_MARGIN_S <= t <= lower_end + LIFT_ALARM_GRACE_S: lift_alarms += 1; break
+    expected = missed = 0
+    latencies = []
+    for rise_start, rise_end, _, _, height, _ in scenario.lifts:
+        if height < LIFT_ALARM_MIN_M or rise_end + LIFT_ALARM_GRACE_S > end_s: continue
+        expected += 1
+        hits = [t for t in alarms if rise_start <= t <= rise_end + LIFT_ALARM_GRACE_S]
+        if hits: latencies.append(hits[0] - rise_start)
+        else: missed += 1
+    return lift_alarms, len(alarms) - lift_alarms, expected, missed, latencies
+
+
+def _skip_monitor_wait(main, utime, config):
+    """모니터링 중 다음 측정까지의 대기(바쁜 대기) 루프를 건너뛰도록 main 의 전역 함수를 감쌈
+
+    대기 루프는 idle_window() 만 반복하므로, 마지막 측정 시작 시각 + 측정 간격의 WAIT_GUARD_US 전까지 시계를 한 번에 진행함.
+    측정 시각 경계(타임아웃 직전의 마지막 측정 등)는 원래 루프 그대로 실행됨.
+    타임아웃 판정은 idle_window() 뒤에 진행 전 루프 시각으로 이루어지므로, 판정을 한 번 통과한 두 번째 대기 루프부터 건너뜀.
+    """
+    read_pressure = main.read_pressure
+    idle_window = main.idle_window
+    timing = {'read_us': None, 'armed': True, 'waiting': False}
+
+    def tracked_read_pressure(*args, **kwargs):
+        if timing['armed']: timing['read_us'] = utime.peek_us(); timing['armed'] = False # 재측정(고정밀)은 제외
+        timing['waiting'] = False
+        return read_pressure(*args, **kwargs)
+
+    def fast_idle_window(now_ms):
+        idle_window(now_ms)
+        timing['armed'] = True
+        monitoring = main.current_state == config.STATE_MONITORING_PRESSURE
+        if monitoring and timing['waiting'] and timing['read_us'] is not None:
+            remaining = timing['read_us'] + config.PRESSURE_MONITOR_INTERVAL_MS * 1000 - WAIT_GUARD_US - utime.peek_us()
+            if remaining > 0: utime.advance_us(remaining)
+        timing['waiting'] = monitoring
+
+    main.read_pressure = tracked_read_pressure
+    main.idle_window = fast_idle_window
+
+
+def run_device(spec):
+    """가상 장치 1대를 실행하고 결과 요약 반환 (병렬 작업 단위)"""
+    wall_start = time.perf_counter()
+    duration_us = int(spec['hours'] * 3600 * 1000000)
+    scenario = Scenario(spec['scenario'], spec['seed'], duration_us / 1e6)
+    _fresh_modules()
+    import utime
+    import machine
+    import fake_devices
+    import config
+    for key, value in spec['overrides'].items(): setattr(config, key, value)
+    config.WAV_FILE_PATH = spec['wav_path']
+    utime.set_virtual_clock(0, spec['call_cost_us'])
+    utime.set_deadline_us(duration_us)
+
+    battery = Battery(spec['battery_mah'], scenario.soc, utime, config)
+    start_v = battery.voltage(0)
+    alarms = []
+    warp_us = 0 if spec['exact'] else int(spec['warp_s'] * 1000000)
+    wake = {'us': DEFAULT_WAKE_US, 'last_end': None}
+
+    def on_sleep(ms):
+        now = utime.peek_us()
+        if wake['last_end'] is not None and 0 < now - wake['last_end'] < 1000000: wake['us'] = now - wake['last_end']
+        sleep_us = (ms or 0) * 1000
+        battery.sleep_us += sleep_us
+        extra = 0
+        if warp_us and sleep_us:
+            quiet_us = int(min(scenario.next_activity(now / 1e6) * 1e6, duration_us)) - now - 2 * sleep_us
+            if quiet_us > sleep_us:
+                extra = min(quiet_us, warp_us)
+                skipped = extra // (sleep_us + wake['us']) # 건너뛴 IDLE 루프 수 (깨어 있는 시간은 활동 전류로 계산)
+                battery.sleep_us += extra - skipped * wake['us']
+        wake['last_end'] = now + extra + sleep_us
+        battery.check_alive()
+        if extra: utime.advance_us(extra)
+
+    def on_i2s(event, i2s):
+        if event == 'init': alarms.append(utime.peek_us() / 1e6); battery.audio(True)
+        elif event == 'deinit': battery.audio(False)
+
+    machine.sleep_listener = on_sleep
+    machine.i2s_listener = on_i2s
+    machine.adc_source = battery.read_u16
+    lsm6ds3 = fake_devices.FakeLSM6DS3(sample_source=lambda: scenario.accel(utime.peek_us() / 1e6))
+    bmp280 = fake_devices.FakeBMP280()
+    bmp280.pressure_source = lambda: scenario.pressure(utime.peek_us() / 1e6)
+    fake_devices.install(_FaultyDevice(lsm6ds3, scenario, 'accel', utime), _FaultyDevice(bmp280, scenario, 'pressure', utime))
+
+    crash = None
+    work_dir = tempfile.mkdtemp(prefix='fleet_sim_')
+    cwd = os.getcwd()
+    try:
+        os.chdir(work_dir) # log.txt, accel_cal.json 은 장치별 작업 디렉터리에 기록
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            try:
+                import main
+                if not spec['exact']: _skip_monitor_wait(main, utime, config)
+                main.main()
+            except KeyboardInterrupt: pass # 시뮬레이션 종료 시각 도달 또는 배터리 방전 (오류 대기 루프 등 메인 루프 밖)
+            except (Exception, SystemExit) as e: crash = f"{type(e).__name__}: {e}"
+        end_us = utime.peek_us()
+        log_path = os.path.join(work_dir, config.LOG_FILE_NAME)
+        log_summary = log_analyzer.analyze_file(log_path) if os.path.exists(log_path) else None
+        if spec['logs_dir'] and log_summary is not None:
+            shutil.copyfile(log_path, os.path.join(spec['logs_dir'], f"{spec['device_id']}.txt"))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        utime.set_deadline_us(None)
+
+    end_s = end_us / 1e6
+    lift_alarms, spurious_alarms, expected, missed, latencies = _evaluate_lifts(scenario, alarms, duration_us / 1e6)
+    counts = log_summary['counts'] if log_summary else {}
+    return {
+        'device': spec['device_id'],
+        'variant': spec['variant'],
+        'scenario': spec['scenario'],
+        'seed': spec['seed'],
+        'sim_h': end_s / 3600,
+        'wall_s': time.perf_counter() - wall_start,
+        'alarms': len(alarms),
+        'lift_alarms': lift_alarms,
+        'spurious_alarms': spurious_alarms,
+        'lifts': len(scenario.lifts),
+        'lifts_expected': expected,
+        'missed_lifts': missed,
+        'latencies_s': latencies,
+        'sessions': counts.get(log_analyzer.TRIGGER, 0),
+        'errors': counts.get(log_analyzer.ERROR, 0),
+        'module_errors': log_summary['module_errors'] if log_summary else {},
+        'low_battery_warnings': counts.get(log_analyzer.LOW_BATTERY, 0),
+        'consumed_mah': battery.consumed_mah(end_us),
+        'start_v': start_v,
+        'end_v': battery.voltage(end_us),
+        'dead_at_h': battery.dead_at_s / 3600 if battery.dead_at_s is not None else None,
+        'crash': crash,
+    }
+
+
+def _percentile(values, fraction):
+    if not values: return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def merge(results):
+    """장치별 결과를 플릿 통계로 병합"""
+    fleet = {'devices': len(results)}
+    for key in ('alarms', 'lift_alarms', 'spurious_alarms', 'lifts', 'lifts_expected', 'missed_lifts', 'sessions',
+                'errors', 'low_battery_warnings'):
+        fleet[key] = sum(r[key] for r in results)
+    device_days = sum(r['sim_h'] for r in results) / 24
+    latencies = [t for r in results for t in r['latencies_s']]
+    mah_per_day = [r['consumed_mah'] / (r['sim_h'] / 24) for r in results if r['sim_h'] > 0]
+    module_errors = {}
+    for r in results:
+        for module, n in r['module_errors'].items(): module_errors[module] = module_errors.get(module, 0) + n
+    fleet['device_days'] = device_days
+    fleet['alarms_per_device_day'] = fleet['alarms'] / device_days if device_days else None
+    fleet['spurious_per_device_day'] = fleet['spurious_alarms'] / device_days if device_days else None
+    fleet['missed_ratio'] = fleet['missed_lifts'] / fleet['lifts_expected'] if fleet['lifts_expected'] else None
+    fleet['latency_median_s'] = _percentile(latencies, 0.5)
+    fleet['latency_p95_s'] = _percentile(latencies, 0.95)
+    fleet['mah_per_day_mean'] = sum(mah_per_day) / len(mah_per_day) if mah_per_day else None
+    fleet['mah_per_day_p95'] = _percentile(mah_per_day, 0.95)
+    fleet['errors_per_device_day'] = fleet['errors'] / device_days if device_days else None
+    fleet['module_errors'] = module_errors
+    fleet['dead_devices'] = sum(1 for r in results if r['dead_at_h'] is not None)
+    fleet['crashed_devices'] = sum(1 for r in results if r['crash'])
+    fleet['wall_s'] = sum(r['wall_s'] for r in results)
+    return fleet
+
+
+def summarize(results):
+    """변형(variant)별 플릿 통계와 시나리오별 세부 통계"""
+    report = {}
+    for variant in sorted({r['variant'] for r in results}):
+        rows = [r for r in results if r['variant'] == variant]
+        summary = merge(rows)
+        summary['scenarios'] = {kind: merge([r for r in rows if r['scenario'] == kind])
+                                for kind in SCENARIOS if any(r['scenario'] == kind for r in rows)}
+        report[variant] = summary
+    return report
+
+
+# (키, 이름, 형식) - 리포트 출력 항목
+_REPORT_ROWS = (
+    ('devices', "장치 수", 'd'),
+    ('device_days', "장치-일", '.1f'),
+    ('alarms', "알람", 'd'),
+    ('alarms_per_device_day', "알람/장치-일", '.2f'),
+    ('spurious_alarms', "인양 외 알람", 'd'),
+    ('spurious_per_device_day', "인양 외 알람/장치-일", '.2f'),
+    ('lifts_expected', f"알람 필요 인양 (>={LIFT_ALARM_MIN_M:g}m)", 'd'),
+    ('missed_lifts', "미검출 인양", 'd'),
+    ('missed_ratio', "미검출 비율", '.3f'),
+    ('latency_median_s', "검출 지연 중앙값 (s)", '.1f'),
+    ('latency_p95_s', "검출 지연 p95 (s)", '.1f'),
+    ('sessions', "모니터링 세션", 'd'),
+    ('mah_per_day_mean', "소비 mAh/일 평균", '.1f'),
+    ('mah_per_day_p95', "소비 mAh/일 p95", '.1f'),
+    ('low_battery_warnings', "저전력 경고", 'd'),
+    ('dead_devices', "방전 정지 장치", 'd'),
+    ('errors_per_device_day', "오류/장치-일", '.1f'),
+    ('crashed_devices', "비정상 종료 장치", 'd'),
+)
+
+
+def _fmt(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def _pad(text, width, right=False):
+    """터미널 표시 폭 기준 정렬 (한글은 2칸)"""
+    fill = ' ' * max(0, width - sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1 for c in text))
+    return fill + text if right else text + fill
+
+
+def print_report(report):
+    variants = list(report)
+    columns = variants + (["차이"] if len(variants) == 2 else [])
+    print(_pad("항목", 30) + "".join(_pad(v, 12, True) for v in columns))
+    for key, name, spec in _REPORT_ROWS:
+        values = [report[v][key] for v in variants]
+        line = _pad(name, 30) + "".join(_pad(_fmt(value, spec), 12, True) for value in values)
+        if len(values) == 2 and None not in values: line += _pad(_fmt(values[1] - values[0], '+' + spec), 12, True)
+        print(line)
+    for variant in variants:
+        print(f"\n[{variant}] 시나리오별: 장치 / 알람/장치-일 / 인양 외 알람 / 미검출/필요 인양 / mAh/일 / 오류")
+        for kind, s in report[variant]['scenarios'].items():
+            print(f"  {kind:<13}{s['devices']:>5}  {_fmt(s['alarms_per_device_day'], '.2f'):>6}  {s['spurious_alarms']:>5}"
+                  f"  {s['missed_lifts']:>5}/{s['lifts_expected']:<5} {_fmt(s['mah_per_day_mean'], '.1f'):>7}  {s['errors']:>6}")
+        for module, n in sorted(report[variant]['module_errors'].items(), key=lambda item: -item[1]):
+            print(f"  오류 {module}: {n}")
+
+
+def parse_overrides(items):
+    """KEY=VALUE 목록을 설정 덮어쓰기 dict 로 변환 (값은 파이썬 리터럴, 해석 불가 시 문자열)"""
+    import config
+    overrides = {}
+    for item in items or ():
+        key, sep, value = item.partition('=')
+        key = key.strip()
+        if not sep or not hasattr(config, key): raise ValueError(f"알 수 없는 설정: {item}")
+        try: overrides[key] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError): overrides[key] = value.strip()
+    if overrides.get('ACQ_ENABLED'): raise ValueError("ACQ_ENABLED 는 가상 시계 시뮬레이션에서 지원하지 않음")
+    return overrides
+
+
+def parse_mix(text):
+    """'hoisting=0.5,idle=0.2,...' 형식의 시나리오 비율"""
+    weights = {}
+    for item in text.split(','):
+        kind, _, weight = item.partition('=')
+        kind = kind.strip()
+        if kind not in SCENARIOS: raise ValueError(f"알 수 없는 시나리오: {kind} (가능: {', '.join(SCENARIOS)})")
+        weights[kind] = float(weight or 1)
+    if sum(weights.values()) <= 0: raise ValueError("시나리오 비율 합이 0")
+    return weights
+
+
+def make_specs(args, variants, wav_path):
+    rng = random.Random(args.seed)
+    kinds = list(args.mix)
+    specs = []
+    for index in range(args.devices):
+        kind = rng.choices(kinds, weights=[args.mix[k] for k in kinds])[0]
+        seed = rng.getrandbits(32)
+        for variant, overrides in variants:
+            specs.append({
+                'device_id': f"{variant}_{index:04d}_{kind}", 'variant': variant, 'scenario': kind, 'seed': seed,
+                'hours': args.hours, 'overrides': overrides, 'warp_s': args.idle_warp_s, 'call_cost_us': args.call_cost_us,
+                'exact': args.exact,
+                'battery_mah': args.battery_mah, 'wav_path': wav_path, 'logs_dir': args.logs_dir,
+            })
+    return specs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 장치 플릿 시뮬레이터")
+    parser.add_argument('--devices', type=int, default=100, help="가상 장치 수")
+    parser.add_argument('--hours', type=float, default=24.0, help="장치당 시뮬레이션 시간 (h)")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="병렬 프로세스 수")
+    parser.add_argument('--seed', type=int, default=0, help="시나리오 배정/생성 시드")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"시나리오 비율 (기본 {DEFAULT_MIX})")
+    parser.add_argument('--set', action='append', metavar='KEY=VALUE', help="모든 장치에 적용할 config 덮어쓰기")
+    parser.add_argument('--variant', action='append', metavar='KEY=VALUE', help="기준과 비교할 config 변경 (같은 시나리오로 함께 실행)")
+    parser.add_argument('--idle-warp-s', type=float, default=60.0, help="IDLE 무활동 구간에서 한 번에 건너뛸 최대 시간 (0 이면 사용 안 함)")
+    parser.add_argument('--call-cost-us', type=int, default=1000, help="ticks 호출 1회당 진행하는 가상 시간 (CPU 실행 시간 모사)")
+    parser.add_argument('--exact', action='store_true', help="가속 없이 모든 루프 실행 (가속 결과 검증용, 느림)")
+    parser.add_argument('--battery-mah', type=float, default=2000.0, help="배터리 용량 (mAh)")
+    parser.add_argument('--alarm-s', type=float, default=3.0, help="알람 음원 재생 시간 (s)")
+    parser.add_argument('--json', help="리포트와 장치별 결과를 JSON 파일로 저장")
+    parser.add_argument('--logs-dir', help="장치별 log.txt 를 저장할 디렉터리 (log_analyzer.py 로 분석 가능)")
+    args = parser.parse_args(argv)
+
+    try:
+        args.mix = parse_mix(args.mix)
+        base = parse_overrides(args.set)
+        variants = [('기준', base)]
+        if args.variant: variants.append(('변경', dict(base, **parse_overrides(args.variant))))
+    except ValueError as e: parser.error(str(e))
+    if args.devices < 1 or args.hours <= 0: parser.error("--devices 와 --hours 는 양수여야 함")
+    if args.logs_dir: # 장치는 임시 작업 디렉터리에서 실행되므로 상대 경로는 미리 절대 경로로 변환
+        args.logs_dir = os.path.abspath(args.logs_dir)
+        os.makedirs(args.logs_dir, exist_ok=True)
+
+    wav_dir = tempfile.mkdtemp(prefix='fleet_sim_wav_')
+    try:
+        wav_path = os.path.join(wav_dir, 'alarm.wav')
+        write_alarm_wav(wav_path, args.alarm_s)
+        specs = make_specs(args, variants, wav_path)
+        started = time.perf_counter()
+        results = []
+        if args.jobs > 1 and len(specs) > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                chunksize = max(1, len(specs) // (args.jobs * 8))
+                for result in pool.map(run_device, specs, chunksize=chunksize):
+                    results.append(result)
+                    if len(results) % max(1, len(specs) // 10) == 0: print(f"진행 {len(results)}/{len(specs)}", file=sys.stderr)
+        else:
+            results = [run_device(spec) for spec in specs]
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(wav_dir, ignore_errors=True)
+
+    report = summarize(results)
+    print_report(report)
+    print(f"\n실행 시간 {elapsed:.1f}s (장치 합계 {sum(r['wall_s'] for r in results):.1f}s, 프로세스 {args.jobs}개)")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'report': report, 'devices': results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
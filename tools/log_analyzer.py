@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""여러 장치의 log.txt 를 스트리밍 방식으로 분석하는 호스트 도구
+
+main.log_event 형식 `[{상대시간}ms],[{전압}V] | 메시지` 의 상대 시간(직전 로그와의 차)을 누적하여
+장치별 절대 타임라인(가동 시간 기준)을 복원하고, 메시지를 종류별 레코드로 분류한 뒤 통계를 출력함.
+파일은 한 줄씩 읽으므로 로그 크기와 무관하게 메모리 사용량이 일정하며, 파일 단위로 여러 코어에서 병렬 처리함.
+
+사용 예:
+    python tools/log_analyzer.py logs/crane_*/log.txt
+    python tools/log_analyzer.py logs/ --jobs 8 --json summary.json --events-dir events/
+
+주의: 장치에 RTC가 없으므로 '일(day)'은 장치 가동 시간 24시간 단위임.
+      ticks_us 기반이던 이전 펌웨어 로그는 약 8.9분 이상 간격의 상대 시간이 순환(wrap)되어 부정확함.
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+MS_PER_HOUR = 3600 * 1000
+MS_PER_DAY = 24 * MS_PER_HOUR
+
+# 이벤트 종류
+BOOT = 'boot'
+TRIGGER = 'trigger'
+ALTITUDE = 'altitude'
+ALARM = 'alarm'
+SESSION_END = 'session_end'
+LOW_BATTERY = 'low_battery'
+BATTERY_OK = 'battery_ok'
+ERROR = 'error'
+OTHER = 'other'
+
+Event = namedtuple('Event', 'boot abs_ms voltage kind value module message')
+
+_LINE_RE = re.compile(r'^\[(-?\d+)ms\],\[(-?[\d.]+)V\] \| (.*)$')
+_MODULE_RE = re.compile(r'^\[(\w+)\] ')
+_INITIAL_ALT_RE = re.compile(r'초기 고도 설정: (-?[\d.]+) m')
+_CURRENT_ALT_RE = re.compile(r'현재=(-?[\d.]+)m')
+_VOLTAGE_RE = re.compile(r'저전력 경고: ([\d.]+)V')
+
+# (메시지 포함 문자열, 종류) - 앞에서부터 먼저 일치하는 항목 사용
+_CLASSIFIERS = (
+    ('시스템 시작', BOOT),
+    ('움직임 감지', TRIGGER),
+    ('임계값', ALARM),
+    ('기압 모니터링 타임아웃', SESSION_END),
+    ('저전력 경고', LOW_BATTERY),
+    ('저전력 상태 해제', BATTERY_OK),
+    ('초기 고도 설정', ALTITUDE),
+    ('고도 변화 모니터링', ALTITUDE),
+    ('오류', ERROR),
+    ('실패', ERROR),
+)
+
+
+def classify(message):
+    """메시지를 (종류, 수치값, 모듈명) 으로 분류"""
+    module_match = _MODULE_RE.match(message)
+    module = module_match.group(1) if module_match else 'Main'
+    for needle, kind in _CLASSIFIERS:
+        if needle in message:
+            break
+    else:
+        return OTHER, None, module
+    value = None
+    if kind == ALTITUDE:
+        match = _INITIAL_ALT_RE.search(message) or _CURRENT_ALT_RE.search(message)
+        value = float(match.group(1)) if match else None
+    elif kind == LOW_BATTERY:
+        match = _VOLTAGE_RE.search(message)
+        value = float(match.group(1)) if match else None
+    return kind, value, module
+
+
+def _open_log(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def iter_events(path, stats=None):
+    """로그 파일을 한 줄씩 읽어 절대 시간이 복원된 Event 를 차례로 반환"""
+    abs_ms = 0
+    boot = 0
+    with _open_log(path) as f:
+        for line in f:
+            match = _LINE_RE.match(line.rstrip('\r\n'))
+            if match is None:
+                if stats is not None and line.strip():
+                    stats['malformed_lines'] += 1
+                continue
+            delta_ms = int(match.group(1))
+            if delta_ms < 0:
+                # ticks 순환 등으로 인한 음수 간격은 0으로 처리
+                if stats is not None:
+                    stats['clock_anomalies'] += 1
+                delta_ms = 0
+            abs_ms += delta_ms
+            message = match.group(3)
+            kind, value, module = classify(message)
+            if kind == BOOT:
+                boot += 1
+            yield Event(boot, abs_ms, float(match.group(2)), kind, value, module, message)
+
+
+class _Regression:
+    """상수 메모리 최소제곱 직선 적합 (누적 합 사용)"""
+
+    def __init__(self):
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, x, y):
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def slope(self):
+        denom = self.n * self.sxx - self.sx * self.sx
+        if self.n < 2 or denom == 0:
+            return None
+        return (self.n * self.sxy - self.sx * self.sy) / denom
+
+
+def analyze_file(path, events_dir=None):
+    """단일 로그 파일 요약 (병렬 작업 단위)"""
+    stats = {'malformed_lines': 0, 'clock_anomalies': 0}
+    counts = {}
+    module_errors = {}
+    alarms_per_day = {}
+    sessions = 0
+    session_ms = 0
+    session_alarms = 0
+    session_start = None
+    min_voltage = None
+    voltage = _Regression()
+    last_ms = 0
+    events = 0
+
+    writer = None
+    events_file = None
+    if events_dir:
+        name = os.path.abspath(path).strip(os.sep).replace(os.sep, '_') + '.csv'
+        events_file = open(os.path.join(events_dir, name), 'w', newline='', encoding='utf-8')
+        writer = csv.writer(events_file)
+        writer.writerow(Event._fields)
+
+    try:
+        for event in iter_events(path, stats):
+            events += 1
+            last_ms = event.abs_ms
+            counts[event.kind] = counts.get(event.kind, 0) + 1
+            if writer is not None:
+                writer.writerow(event)
+            if event.voltage > 0:
+                voltage.add(event.abs_ms / MS_PER_HOUR, event.voltage)
+                if min_voltage is None or event.voltage < min_voltage:
+                    min_voltage = event.voltage
+            if event.kind == TRIGGER:
+                session_start = event.abs_ms
+            elif event.kind == ALARM:
+                day = event.abs_ms // MS_PER_DAY
+                alarms_per_day[day] = alarms_per_day.get(day, 0) + 1
+                if session_start is not None:
+                    session_alarms += 1
+            elif event.kind in (SESSION_END, BOOT) and session_start is not None:
+                sessions += 1
+                session_ms += event.abs_ms - session_start
+                session_start = None
+            elif event.kind == ERROR:
+                module_errors[event.module] = module_errors.get(event.module, 0) + 1
+    finally:
+        if events_file is not None:
+            events_file.close()
+
+    return {
+        'file': path,
+        'events': events,
+        'uptime_ms': last_ms,
+        'boots': counts.get(BOOT, 0),
+        'counts': counts,
+        'module_errors': module_errors,
+        'alarms_per_day': alarms_per_day,
+        'sessions': sessions,
+        'session_ms': session_ms,
+        'session_alarms': session_alarms,
+        'min_voltage': min_voltage,
+        'voltage_slope_v_per_h': voltage.slope(),
+        'malformed_lines': stats['malformed_lines'],
+        'clock_anomalies': stats['clock_anomalies'],
+    }
+
+
+def merge(summaries):
+    """파일별 요약을 플릿 통계로 병합"""
+    fleet = {
+        'files': len(summaries), 'events': 0, 'uptime_h': 0.0, 'boots': 0, 'counts': {}, 'module_errors': {},
+        'sessions': 0, 'session_alarms': 0, 'malformed_lines': 0, 'clock_anomalies': 0,
+    }
+    session_ms = 0
+    device_days = 0.0
+    slopes = []
+    for s in summaries:
+        fleet['events'] += s['events']
+        fleet['uptime_h'] += s['uptime_ms'] / MS_PER_HOUR
+        device_days += s['uptime_ms'] / MS_PER_DAY
+        fleet['boots'] += s['boots']
+        fleet['sessions'] += s['sessions']
+        fleet['session_alarms'] += s['session_alarms']
+        fleet['malformed_lines'] += s['malformed_lines']
+        fleet['clock_anomalies'] += s['clock_anomalies']
+        session_ms += s['session_ms']
+        for key in ('counts', 'module_errors'):
+            for name, n in s[key].items():
+                fleet[key][name] = fleet[key].get(name, 0) + n
+        if s['voltage_slope_v_per_h'] is not None:
+            slopes.append(s['voltage_slope_v_per_h'])
+
+    alarms = fleet['counts'].get(ALARM, 0)
+    errors = fleet['counts'].get(ERROR, 0)
+    fleet['alarms'] = alarms
+    fleet['alarms_per_device_day'] = alarms / device_days if device_days else None
+    fleet['mean_session_s'] = session_ms / fleet['sessions'] / 1000 if fleet['sessions'] else None
+    fleet['errors_per_hour'] = errors / fleet['uptime_h'] if fleet['uptime_h'] else None
+    fleet['error_ratio'] = errors / fleet['events'] if fleet['events'] else None
+    slopes.sort()
+    fleet['voltage_slope_median_mv_per_h'] = slopes[len(slopes) // 2] * 1000 if slopes else None
+    fleet['voltage_slope_worst_mv_per_h'] = slopes[0] * 1000 if slopes else None
+    fleet['devices'] = [
+        {'file': s['file'], 'uptime_h': s['uptime_ms'] / MS_PER_HOUR, 'alarms_per_day': s['alarms_per_day'],
+         'min_voltage': s['min_voltage'], 'voltage_slope_v_per_h': s['voltage_slope_v_per_h'],
+         'errors': s['counts'].get(ERROR, 0)}
+        for s in summaries
+    ]
+    return fleet
+
+
+def find_logs(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                for name in sorted(filenames):
+                    if name.endswith(('.txt', '.log', '.txt.gz', '.log.gz')):
+                        yield os.path.join(dirpath, name)
+        else:
+            yield path
+
+
+def _fmt(value, spec='.2f'):
+    return '-' if value is None else format(value, spec)
+
+
+def print_report(fleet):
+    print(f"파일 {fleet['files']}개, 이벤트 {fleet['events']}개, 총 가동 {fleet['uptime_h']:.1f}시간, 부팅 {fleet['boots']}회")
+    print(f"알람 {fleet['alarms']}회 (장치-일당 {_fmt(fleet['alarms_per_device_day'])}회)")
+    print(f"모니터링 세션 {fleet['sessions']}회, 평균 {_fmt(fleet['mean_session_s'], '.1f')}초, 세션 내 알람 {fleet['session_alarms']}회")
+    print(f"전압 변화율 중앙값 {_fmt(fleet['voltage_slope_median_mv_per_h'])} mV/h, 최악 {_fmt(fleet['voltage_slope_worst_mv_per_h'])} mV/h")
+    print(f"오류 {fleet['counts'].get(ERROR, 0)}회 (시간당 {_fmt(fleet['errors_per_hour'], '.3f')}, 이벤트 대비 {_fmt(fleet['error_ratio'], '.4f')})")
+    for module, n in sorted(fleet['module_errors'].items(), key=lambda item: -item[1]):
+        print(f"  {module}: {n}")
+    print("이벤트 종류별: " + ", ".join(f"{k}={v}" for k, v in sorted(fleet['counts'].items())))
+    if fleet['malformed_lines'] or fleet['clock_anomalies']:
+        print(f"형식 오류 줄 {fleet['malformed_lines']}개, 시간 역행 {fleet['clock_anomalies']}회")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="플릿 log.txt 스트리밍 분석기")
+    parser.add_argument('paths', nargs='+', help="로그 파일 또는 디렉터리")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="병렬 프로세스 수")
+    parser.add_argument('--json', help="요약을 JSON 파일로 저장")
+    parser.add_argument('--events-dir', help="파일별 분류 레코드를 CSV로 저장할 디렉터리")
+    args = parser.parse_args(argv)
+
+    files = list(find_logs(args.paths))
+    if not files:
+        parser.error("분석할 로그 파일이 없습니다")
+    if args.events_dir:
+        os.makedirs(args.events_dir, exist_ok=True)
+
+    if args.jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            summaries = list(pool.map(analyze_file, files, [args.events_dir] * len(files)))
+    else:
+        summaries = [analyze_file(path, args.events_dir) for path in files]
+
+    fleet = merge(summaries)
+    print_report(fleet)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(fleet, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""UART 텔레메트리 수집기 (호스트용)
+
+보드가 보내는 CRC 프레임 스트림(telemetry_protocol.py 형식)을 시리얼 포트, 의사 터미널(pty)
+또는 캡처 파일에서 읽어 디코딩하고, 메시지 종류별 열(column) 단위 파일로 저장함.
+pyarrow 가 설치되어 있으면 Parquet, 없으면 CSV 로 기록.
+
+사용 예:
+    python tools/telemetry_collector.py --port /dev/ttyUSB0 --out telemetry_out
+    python tools/telemetry_collector.py --port /dev/pts/5 --out telemetry_out   # pty (pyserial 불필요)
+    python tools/telemetry_collector.py --file capture.bin --out telemetry_out
+    python tools/telemetry_collector.py --throughput 115200
+"""
+import argparse
+import csv
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import telemetry_protocol as proto  # noqa: E402
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+READ_CHUNK_SIZE = 4096
+FLUSH_ROWS = 1000
+
+
+class FrameDecoder:
+    """바이트 스트림에서 프레임을 찾아 디코딩 (CRC 오류 시 다음 SYNC 로 재동기화)"""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.unknown_types = 0
+        self.lost_frames = 0
+        self._last_seq = None
+
+    def feed(self, data):
+        """수신 데이터를 추가하고 완성된 (msg_type, seq, values) 를 차례로 반환"""
+        self._buf.extend(data)
+        buf = self._buf
+        pos = 0
+        while True:
+            start = buf.find(proto.SYNC, pos)
+            if start < 0:
+                # 마지막 바이트가 SYNC 의 앞부분일 수 있으므로 남겨 둠
+                pos = max(pos, len(buf) - 1)
+                break
+            if len(buf) - start < proto.HEADER_SIZE:
+                pos = start
+                break
+            msg_type, seq, length = buf[start + 2], buf[start + 3], buf[start + 4]
+            end = start + proto.HEADER_SIZE + length
+            if len(buf) < end + proto.CRC_SIZE:
+                pos = start
+                break
+            crc = struct.unpack_from('<H', buf, end)[0]
+            if crc != proto.crc16(buf, start + 2, end):
+                self.crc_errors += 1
+                pos = start + 1
+                continue
+            pos = end + proto.CRC_SIZE
+            if proto.PAYLOAD_SIZES.get(msg_type) != length:
+                self.unknown_types += 1
+                continue
+            self._track_seq(seq)
+            self.frames += 1
+            yield msg_type, seq, struct.unpack_from(proto.PAYLOAD_FORMATS[msg_type], buf, start + proto.HEADER_SIZE)
+        del buf[:pos]
+
+    def _track_seq(self, seq):
+        if self._last_seq is not None:
+            self.lost_frames += (seq - self._last_seq - 1) & 0xFF
+        self._last_seq = seq
+
+
+class ColumnarSink:
+    """메시지 종류별 열 버퍼를 모아 일정 행 수마다 파일로 기록"""
+
+    def __init__(self, out_dir, fmt):
+        self.out_dir = out_dir
+        self.fmt = fmt
+        os.makedirs(out_dir, exist_ok=True)
+        self._columns = {}
+        self._writers = {}
+        self._rows = 0
+
+    def _fields(self, msg_type):
+        return ('host_time', 'seq') + proto.FIELD_NAMES[msg_type]
+
+    def add(self, msg_type, seq, values, host_time):
+        columns = self._columns.get(msg_type)
+        if columns is None:
+            columns = self._columns[msg_type] = [[] for _ in self._fields(msg_type)]
+        for column, value in zip(columns, (host_time, seq) + tuple(values)):
+            column.append(value)
+        self._rows += 1
+        if self._rows >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        for msg_type, columns in self._columns.items():
+            if not columns[0]:
+                continue
+            fields = self._fields(msg_type)
+            name = proto.MSG_NAMES[msg_type]
+            if self.fmt == 'parquet':
+                table = pyarrow.table(dict(zip(fields, columns)))
+                writer = self._writers.get(msg_type)
+                if writer is None:
+                    path = os.path.join(self.out_dir, name + '.parquet')
+                    writer = self._writers[msg_type] = pyarrow.parquet.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            else:
+                path = os.path.join(self.out_dir, name + '.csv')
+                new_file = not os.path.exists(path)
+                with open(path, 'a', newline='') as f:
+                    writer = csv.writer(f)
+                    if new_file:
+                        writer.writerow(fields)
+                    writer.writerows(zip(*columns))
+            for column in columns:
+                column.clear()
+        self._rows = 0
+
+    def close(self):
+        self.flush()
+        for writer in self._writers.values():
+            writer.close()
+
+
+def open_stream(args):
+    """입력 스트림 열기: 캡처 파일, pyserial 포트 또는 raw 모드 tty/pty"""
+    if args.file:
+        return open(args.file, 'rb')
+    try:
+        import serial
+    except ImportError:
+        serial = None
+    if serial is not None:
+        return serial.Serial(args.port, args.baud, timeout=0.5)
+    import termios
+    import tty
+    fd = os.open(args.port, os.O_RDONLY | os.O_NOCTTY)
+    tty.setraw(fd)
+    attrs = termios.tcgetattr(fd)
+    speed = getattr(termios, 'B%d' % args.baud, None)
+    if speed is not None:
+        attrs[4] = attrs[5] = speed
+    # VMIN=0, VTIME=5: 데이터가 없으면 0.5초 후 빈 값 반환 (pyserial timeout 과 동일, --duration 확인용)
+    attrs[6][termios.VMIN] = 0
+    attrs[6][termios.VTIME] = 5
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+    return os.fdopen(fd, 'rb', buffering=0)
+
+
+def print_throughput(baudrate):
+    print(f"{baudrate} baud (8N1) 최대 처리량:")
+    for msg_type, name in sorted(proto.MSG_NAMES.items()):
+        frame_size = proto.FRAME_OVERHEAD + proto.PAYLOAD_SIZES[msg_type]
+        print(f"  {name:<9} {frame_size:>3} B  {proto.frames_per_second(baudrate, msg_type):7.1f} msg/s")
+
+
+def collect(stream, sink, decoder, duration=None, stop_at_eof=False):
+    started = time.time()
+    try:
+        while duration is None or time.time() - started < duration:
+            data = stream.read(READ_CHUNK_SIZE)
+            if not data:
+                if stop_at_eof:
+                    break  # 캡처 파일 끝
+                continue
+            now = time.time()
+            for msg_type, seq, values in decoder.feed(data):
+                sink.add(msg_type, seq, values, now)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="UART 텔레메트리 수집기")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--port', help="시리얼 포트 또는 pty 경로")
+    source.add_argument('--file', help="캡처한 바이너리 스트림 파일")
+    source.add_argument('--throughput', type=int, metavar='BAUD', help="보레이트별 최대 메시지 처리량 출력")
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--out', default='telemetry_out', help="출력 디렉터리")
+    parser.add_argument('--format', choices=('parquet', 'csv'), default='parquet' if pyarrow else 'csv')
+    parser.add_argument('--duration', type=float, help="수집 시간 (초), 미지정 시 Ctrl+C 까지")
+    args = parser.parse_args(argv)
+
+    if args.throughput:
+        print_throughput(args.throughput)
+        return 0
+    if args.format == 'parquet' and pyarrow is None:
+        parser.error("parquet 출력에는 pyarrow 가 필요합니다")
+
+    decoder = FrameDecoder()
+    sink = ColumnarSink(args.out, args.format)
+    with open_stream(args) as stream:
+        collect(stream, sink, decoder, args.duration, stop_at_eof=bool(args.file))
+    print(f"프레임 {decoder.frames}개 수신, CRC 오류 {decoder.crc_errors}, 유실 {decoder.lost_frames}, "
+          f"알 수 없는 형식 {decoder.unknown_types} -> {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import math
+import utime
+from array import array
+import config
+
+# 고도 추세(수직 속도) 검출기
+# 최근 TREND_WINDOW_SAMPLES 개 고도 샘플의 선형 회귀를 누적 합(Σx, Σy, Σxx, Σxy, Σyy)으로 샘플당 O(1) 갱신.
+# 기울기(수직 속도), 결정계수 R²(신뢰도), 기울기 t 통계량으로 꾸준한 인양(상승/하강)과
+# 바람에 의한 순간적인 기압 요동을 구분함.
+# x = 기준 시각(_origin_ticks) 이후 경과 시간(s), y = 세션 시작 고도(_base_altitude) 대비 고도(m)
+# 값을 작게 유지하여 단정밀도 float(RP2040)에서도 누적 오차가 작도록 하고,
+# 윈도우 길이만큼 갱신할 때마다 기준 시각을 옮기며 합계를 다시 계산함 (분할 상환 O(1)).
+
+# 모듈 전역 변수 (윈도우 버퍼는 reset 시 크기가 다를 때만 할당)
+_ticks = array('i')
+_alts = array('f')
+_head = 0 # 다음 기록 위치 (가장 오래된 샘플 위치)
+_count = 0
+_origin_ticks = 0
+_base_altitude = 0.0
+_since_rebuild = 0
+_sx = _sy = _sxx = _sxy = _syy = 0.0
+# 마지막 추정 결과
+vertical_speed = 0.0 # m/s (+ 상승)
+r_squared = 0.0 # 결정계수 (0~1, 신뢰도)
+t_stat = 0.0 # 기울기 / 기울기 표준오차
+projected_change = 0.0 # 기준 고도 대비 예상 변화량 (m, TREND_LOOKAHEAD_S 후)
+trending = False # 속도/신뢰도 기준을 넘는 추세가 진행 중 (변화량과 무관)
+
+def reset():
+    """새 모니터링 세션 시작 시 윈도우 초기화"""
+    global _ticks, _alts, _head, _count, _since_rebuild, vertical_speed, r_squared, t_stat, projected_change, trending
+    size = config.TREND_WINDOW_SAMPLES
+    if len(_ticks) != size:
+        _ticks = array('i', [0] * size); _alts = array('f', [0.0] * size)
+    _head = _count = _since_rebuild = 0
+    _clear_sums()
+    vertical_speed = r_squared = t_stat = projected_change = 0.0; trending = False
+
+def _clear_sums():
+    global _sx, _sy, _sxx, _sxy, _syy
+    _sx = _sy = _sxx = _sxy = _syy = 0.0
+
+def _x(ticks):
+    return utime.ticks_diff(ticks, _origin_ticks) / 1000.0
+
+def _accumulate(x, y, sign):
+    global _sx, _sy, _sxx, _sxy, _syy
+    _sx += sign * x; _sy += sign * y
+    _sxx += sign * x * x; _sxy += sign * x * y; _syy += sign * y * y
+
+def _rebuild():
+    """기준 시각을 가장 오래된 샘플로 옮기고 합계 재계산 (누적 오차 제거)"""
+    global _origin_ticks, _since_rebuild
+    size = len(_ticks)
+    oldest = (_head - _count) % size
+    _origin_ticks = _ticks[oldest]
+    _clear_sums()
+    for i in range(_count):
+        index = (oldest + i) % size
+        _accumulate(_x(_ticks[index]), _alts[index], 1)
+    _since_rebuild = 0
+
+def add_sample(now_ms, altitude):
+    """고도 샘플 추가 (윈도우가 가득 차면 가장 오래된 샘플 제거)"""
+    global _head, _count, _origin_ticks, _base_altitude, _since_rebuild
+    size = len(_ticks)
+    if size == 0: reset(); size = len(_ticks)
+    if _count == 0:
+        _origin_ticks = now_ms; _base_altitude = altitude
+    if _count == size:
+        _accumulate(_x(_ticks[_head]), _alts[_head], -1)
+    else: _count += 1
+    _ticks[_head] = now_ms
+    _alts[_head] = altitude - _base_altitude
+    _accumulate(_x(now_ms), _alts[_head], 1) # 저장된(단정밀도) 값으로 누적하여 제거 시와 일치
+    _head = (_head + 1) % size
+    _since_rebuild += 1
+    if _since_rebuild >= size: _rebuild()
+
+def _fit():
+    """회귀 결과 갱신, (절편, 최신 샘플 x) 반환 - 샘플 부족 또는 시간 분산 0 이면 None"""
+    global vertical_speed, r_squared, t_stat
+    n = _count
+    if n < 3: return None
+    sxx = _sxx - _sx * _sx / n
+    if sxx <= 0: return None
+    sxy = _sxy - _sx * _sy / n
+    syy = _syy - _sy * _sy / n
+    slope = sxy / sxx
+    vertical_speed = slope
+    sse = syy - slope * sxy # 잔차 제곱합
+    if syy <= 0 or sse <= 0:
+        r_squared = 1.0 if syy > 0 else 0.0
+        t_stat = 1e9 if slope != 0 else 0.0 # 잔차 없음 (완전한 직선)
+    else:
+        r_squared = 1.0 - sse / syy
+        t_stat = abs(slope) / math.sqrt(sse / (n - 2) / sxx)
+    intercept = (_sy - slope * _sx) / n
+    return intercept, _x(_ticks[(_head - 1) % len(_ticks)])
+
+def lift_detected(reference_altitude):
+    """수직 속도/신뢰도/예상 변화량이 모두 기준을 넘으면 True (reference_altitude: 알람 판정 기준 고도)"""
+    global projected_change, trending
+    projected_change = 0.0; trending = False
+    if _count < config.TREND_MIN_SAMPLES: return False
+    fit = _fit()
+    if fit is None: return False
+    intercept, newest_x = fit
+    # 회귀선 위의 현재 고도에서 TREND_LOOKAHEAD_S 후까지 외삽한 변화량
+    fitted_now = _base_altitude + intercept + vertical_speed * newest_x
+    projected_change = fitted_now + vertical_speed * config.TREND_LOOKAHEAD_S - reference_altitude
+    trending = (abs(vertical_speed) >= config.TREND_MIN_SPEED_MPS and t_stat >= config.TREND_MIN_T_STAT
+                and r_squared >= config.TREND_MIN_R2)
+    return trending and abs(projected_change) >= config.ALTITUDE_CHANGE_THRESHOLD
+
+def sample_count():
+    return _count